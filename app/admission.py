@@ -0,0 +1,128 @@
+import json
+from typing import Dict, Optional
+
+import anyio
+
+from .config import settings
+from .metrics import ADMISSION_IN_PROGRESS, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS
+
+API_PREFIX = "/api/v1/"
+
+
+class AdmissionGate:
+    """
+    Concurrency limit with a bounded, time-limited wait queue for one
+    route group.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.waiting = 0
+        self._semaphore: Optional[anyio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> anyio.Semaphore:
+        # Created on first use so it belongs to the serving event loop.
+        if self._semaphore is None:
+            self._semaphore = anyio.Semaphore(self.limit)
+        return self._semaphore
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Wait for a slot.
+
+        Returns:
+            None once admitted, or the rejection reason ("queue_full" or
+            "timeout"); the caller must release() only when admitted.
+        """
+        semaphore = self.semaphore
+        if semaphore.value > 0 and not self.waiting:
+            await semaphore.acquire()
+            return None
+        if self.waiting >= self.max_queue:
+            return "queue_full"
+
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.labels(self.name).inc()
+        try:
+            with anyio.move_on_after(self.timeout):
+                await semaphore.acquire()
+                return None
+            return "timeout"
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.labels(self.name).dec()
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+
+def route_group(path: str) -> Optional[str]:
+    """
+    Map a request path to its route group, e.g. /api/v1/users/3 -> "users".
+    """
+    if not path.startswith(API_PREFIX):
+        return None
+    return path[len(API_PREFIX):].split("/", 1)[0] or None
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that sheds load before it reaches the thread pool.
+
+    Each route group in `settings.admission_limits` may have that many
+    requests in progress; up to `admission_queue_size` more wait at most
+    `admission_queue_timeout` seconds. Anything beyond that gets an
+    immediate 503 with a Retry-After header instead of queueing unseen in
+    the thread pool.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self.gates: Dict[str, AdmissionGate] = {
+            name: AdmissionGate(
+                name,
+                limit,
+                settings.admission_queue_size,
+                settings.admission_queue_timeout,
+            )
+            for name, limit in settings.admission_limits.items()
+        }
+
+    async def __call__(self, scope, receive, send) -> None:
+        gate = None
+        if scope["type"] == "http":
+            gate = self.gates.get(route_group(scope["path"]))
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        rejection = await gate.acquire()
+        if rejection is not None:
+            ADMISSION_REJECTIONS.labels(gate.name, rejection).inc()
+            await self._reject(send)
+            return
+
+        ADMISSION_IN_PROGRESS.labels(gate.name).inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ADMISSION_IN_PROGRESS.labels(gate.name).dec()
+            gate.release()
+
+    @staticmethod
+    async def _reject(send) -> None:
+        body = json.dumps({"detail": "Server is overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.admission_retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Callable, Dict, Hashable, Tuple
+
+from .config import settings
+from .metrics import LIST_CACHE_LOOKUPS
+
+
+class ListResponseCache:
+    """
+    Encoded list responses keyed on a per-table generation counter.
+
+    Every successful create, update and delete in app.crud bumps its
+    table's generation, which invalidates all cached responses for that
+    table. Generations are per process, so entries also expire after
+    `settings.list_cache_max_age` seconds to bound how stale another
+    worker's writes can look.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._generations: Dict[str, int] = {}
+        # (table, key) -> (generation, stored_at, body)
+        self._entries: Dict[Tuple[str, Hashable], Tuple[int, float, bytes]] = {}
+
+    def generation(self, table: str) -> int:
+        return self._generations.get(table, 0)
+
+    def bump(self, table: str) -> None:
+        """
+        Invalidate every cached response for `table`.
+
+        Call after the write has committed, never before.
+        """
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            for entry_key in [k for k in self._entries if k[0] == table]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_build(self, table: str, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached body for (table, key) or build and cache it.
+
+        Args:
+            table: table whose generation guards the entry
+            key: anything identifying the variant, e.g. a page or filter
+            build: produces the encoded response body
+
+        Returns:
+            The encoded response body.
+        """
+        if not settings.list_cache_enabled:
+            return build()
+
+        max_age = settings.list_cache_max_age
+        entry = self._entries.get((table, key))
+        if (
+            entry is not None
+            and entry[0] == self.generation(table)
+            and (max_age <= 0 or time.monotonic() - entry[1] < max_age)
+        ):
+            LIST_CACHE_LOOKUPS.labels(table, "hit").inc()
+            return entry[2]
+
+        LIST_CACHE_LOOKUPS.labels(table, "miss").inc()
+        # Read the generation before querying: a write that commits while
+        # we build bumps past it, so the result is never stored as current.
+        generation = self.generation(table)
+        body = build()
+        with self._lock:
+            if generation == self.generation(table):
+                self._entries[(table, key)] = (generation, time.monotonic(), body)
+        return body
+
+
+list_cache = ListResponseCache()
@@ -0,0 +1,149 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """
+    Read a boolean flag from the environment.
+
+    Accepts 1/0, true/false, yes/no, on/off (case-insensitive).
+    """
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    return float(raw) if raw else default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw else default
+
+
+def _env_limits(name: str) -> Dict[str, int]:
+    """
+    Read "group=limit" pairs, e.g. "users=16,partners=8".
+    """
+    limits = {}
+    for item in (os.getenv(name) or "").split(","):
+        if item.strip():
+            group, _, limit = item.partition("=")
+            limits[group.strip()] = int(limit)
+    return limits
+
+
+@dataclass
+class Settings:
+    """
+    Runtime configuration, read from environment variables.
+
+    Intervals are in seconds; a non-positive interval disables that job.
+    """
+    database_url: str = field(
+        default_factory=lambda: os.getenv("DATABASE_URL", "sqlite:///./data.db")
+    )
+    auto_create_schema: bool = field(
+        default_factory=lambda: _env_bool("AUTO_CREATE_SCHEMA", True)
+    )
+    startup_timing: bool = field(
+        default_factory=lambda: _env_bool("STARTUP_TIMING", False)
+    )
+
+    # Background database maintenance
+    maintenance_enabled: bool = field(
+        default_factory=lambda: _env_bool("MAINTENANCE_ENABLED", True)
+    )
+    maintenance_optimize_interval: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_OPTIMIZE_INTERVAL", 3600.0)
+    )
+    maintenance_checkpoint_interval: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_CHECKPOINT_INTERVAL", 300.0)
+    )
+    maintenance_truncate_interval: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_TRUNCATE_INTERVAL", 3600.0)
+    )
+    maintenance_vacuum_interval: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_VACUUM_INTERVAL", 1800.0)
+    )
+    maintenance_vacuum_pages: int = field(
+        default_factory=lambda: _env_int("MAINTENANCE_VACUUM_PAGES", 1000)
+    )
+    maintenance_latency_threshold_ms: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_LATENCY_THRESHOLD_MS", 200.0)
+    )
+    maintenance_max_backoff: float = field(
+        default_factory=lambda: _env_float("MAINTENANCE_MAX_BACKOFF", 600.0)
+    )
+
+    # Prometheus metrics
+    metrics_enabled: bool = field(
+        default_factory=lambda: _env_bool("METRICS_ENABLED", True)
+    )
+
+    # Per-request diagnostics
+    server_timing_enabled: bool = field(
+        default_factory=lambda: _env_bool("SERVER_TIMING_ENABLED", False)
+    )
+    slow_request_ms: float = field(
+        default_factory=lambda: _env_float("SLOW_REQUEST_MS", 0.0)
+    )
+
+    # Hash- or range-sharded partner storage (0 shards = single database)
+    partner_shards: int = field(
+        default_factory=lambda: _env_int("PARTNER_SHARDS", 0)
+    )
+    partner_shard_url: str = field(
+        default_factory=lambda: os.getenv(
+            "PARTNER_SHARD_URL", "sqlite:///./partners-{shard}.db"
+        )
+    )
+    partner_shard_routing: str = field(
+        default_factory=lambda: os.getenv("PARTNER_SHARD_ROUTING", "hash")
+    )
+    partner_shard_range_size: int = field(
+        default_factory=lambda: _env_int("PARTNER_SHARD_RANGE_SIZE", 1 << 40)
+    )
+
+    # Admission control for sync routes
+    admission_limits: Dict[str, int] = field(
+        default_factory=lambda: _env_limits("ADMISSION_LIMITS")
+    )
+    admission_queue_size: int = field(
+        default_factory=lambda: _env_int("ADMISSION_QUEUE_SIZE", 64)
+    )
+    admission_queue_timeout: float = field(
+        default_factory=lambda: _env_float("ADMISSION_QUEUE_TIMEOUT", 1.0)
+    )
+    admission_retry_after: int = field(
+        default_factory=lambda: _env_int("ADMISSION_RETRY_AFTER", 1)
+    )
+    threadpool_size: int = field(
+        default_factory=lambda: _env_int("THREADPOOL_SIZE", 0)
+    )
+
+    # Write-behind buffering of user status updates
+    user_write_behind: bool = field(
+        default_factory=lambda: _env_bool("USER_WRITE_BEHIND", False)
+    )
+    user_write_behind_window: float = field(
+        default_factory=lambda: _env_float("USER_WRITE_BEHIND_WINDOW", 0.5)
+    )
+    user_write_behind_max_pending: int = field(
+        default_factory=lambda: _env_int("USER_WRITE_BEHIND_MAX_PENDING", 10_000)
+    )
+
+    # Generation-versioned cache of encoded list responses
+    list_cache_enabled: bool = field(
+        default_factory=lambda: _env_bool("LIST_CACHE_ENABLED", False)
+    )
+    list_cache_max_age: float = field(
+        default_factory=lambda: _env_float("LIST_CACHE_MAX_AGE", 1.0)
+    )
+
+
+settings = Settings()
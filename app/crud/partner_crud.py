@@ -1,9 +1,26 @@
 import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
+from ..cache import list_cache
+from ..diagnostics import phase
 from ..models import PartnerTable
+from .partner_shards import get_partner_store
+
+
+def json_path(field: str) -> str:
+    """
+    Turn a dotted field name inside `data` (e.g. "address.city") into a
+    SQLite JSON path.
+
+    Raises:
+        ValueError: if the name contains anything but identifiers and dots.
+    """
+    if not all(part.isidentifier() for part in field.split(".")):
+        raise ValueError(f"invalid field name {field!r}")
+    return "$." + field
 
 
 def list_partners(db: Session) -> List[Dict[str, Any]]:
@@ -16,8 +33,254 @@ def list_partners(db: Session) -> List[Dict[str, Any]]:
     Returns:
         A list of dicts, each containing 'id' and the parsed 'data'.
     """
-    rows = db.query(PartnerTable).all()
-    return [{"id": row.id, "data": json.loads(row.data)} for row in rows]
+    store = get_partner_store()
+    if store is not None:
+        return store.list_partners()
+
+    with phase("db"):
+        rows = db.query(PartnerTable).all()
+    with phase("decode"):
+        return [{"id": row.id, "data": json.loads(row.data)} for row in rows]
+
+
+def find_partners(
+    db: Session,
+    field: str,
+    value: Any,
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve partners whose `data` has `value` at `field`.
+
+    Args:
+        db: database session
+        field: dotted path inside 'data', e.g. "region" or "address.city"
+        value: scalar to compare with (booleans are stored as 1/0)
+
+    Returns:
+        A list of dicts, each containing 'id' and the parsed 'data'.
+    """
+    path = json_path(field)
+    store = get_partner_store()
+    if store is not None:
+        return store.find_partners(path, value)
+
+    with phase("db"):
+        rows = (
+            db.query(PartnerTable)
+            .filter(func.json_extract(PartnerTable.data, path) == value)
+            .all()
+        )
+    with phase("decode"):
+        return [{"id": row.id, "data": json.loads(row.data)} for row in rows]
+
+
+def count_partners(db: Session) -> int:
+    """
+    Count all partners.
+
+    Args:
+        db: database session
+
+    Returns:
+        The number of stored partners.
+    """
+    store = get_partner_store()
+    if store is not None:
+        return store.count_partners()
+    return db.query(PartnerTable).count()
+
+
+AGGREGATE_FUNCTIONS = ("count", "sum", "min", "max", "avg")
+FILTER_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+}
+
+
+def parse_metric(spec: str) -> Tuple[str, Optional[str]]:
+    """
+    Parse "count" or "<function>:<field>", e.g. "sum:revenue".
+
+    Raises:
+        ValueError: on an unknown function, a bad field name, or a
+            non-count function without a field.
+    """
+    function, _, field = spec.partition(":")
+    if function not in AGGREGATE_FUNCTIONS:
+        raise ValueError(f"unknown aggregate {function!r}; expected one of {AGGREGATE_FUNCTIONS}")
+    if not field:
+        if function != "count":
+            raise ValueError(f"{function!r} needs a field, e.g. {function}:revenue")
+        return function, None
+    json_path(field)
+    return function, field
+
+
+def parse_filter(spec: str) -> Tuple[str, str, Any]:
+    """
+    Parse "<field>:<op>:<value>", e.g. "tier:eq:gold" or "revenue:gte:1000".
+
+    The value is read as JSON when possible (numbers, true/false, quoted
+    strings) and as a plain string otherwise.
+
+    Raises:
+        ValueError: on a malformed clause, bad field name or unknown operator.
+    """
+    parts = spec.split(":", 2)
+    if len(parts) != 3:
+        raise ValueError(f"invalid filter {spec!r}; expected field:op:value")
+    field, op, raw = parts
+    json_path(field)
+    if op not in FILTER_OPERATORS:
+        raise ValueError(f"unknown operator {op!r}; expected one of {tuple(FILTER_OPERATORS)}")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    if isinstance(value, (dict, list)) or value is None:
+        value = raw
+    return field, op, value
+
+
+def _aggregate_partials(
+    db: Session,
+    group_by: Optional[str],
+    metrics: List[Tuple[str, Optional[str]]],
+    filters: List[Tuple[str, str, Any]],
+) -> Dict[Any, List[Any]]:
+    # Mergeable partial results per group: avg is carried as (sum, count)
+    # so shards can be combined before dividing.
+    def extract(field: str):
+        return func.json_extract(PartnerTable.data, json_path(field))
+
+    columns = []
+    for function, field in metrics:
+        if function == "count":
+            columns.append(func.count(extract(field)) if field else func.count())
+        elif function == "avg":
+            columns.extend([func.sum(extract(field)), func.count(extract(field))])
+        else:
+            columns.append(getattr(func, function)(extract(field)))
+
+    group_key = extract(group_by) if group_by else None
+    query = select(*([group_key] if group_key is not None else []), *columns).select_from(
+        PartnerTable
+    )
+    for field, op, value in filters:
+        query = query.where(FILTER_OPERATORS[op](extract(field), value))
+    if group_key is not None:
+        query = query.group_by(group_key)
+
+    partials = {}
+    with phase("db"):
+        result = db.execute(query).all()
+    for row in result:
+        if group_key is not None:
+            partials[row[0]] = list(row[1:])
+        else:
+            partials[None] = list(row)
+    return partials
+
+
+def _sqlite_order(value: Any) -> Tuple[int, Any]:
+    # SQLite's cross-type order: NULL < numbers < text < blob.
+    if value is None:
+        return 0, 0
+    if isinstance(value, (int, float)):
+        return 1, value
+    if isinstance(value, str):
+        return 2, value
+    return 3, value
+
+
+def _merge_partials(
+    per_source: List[Dict[Any, List[Any]]],
+    metrics: List[Tuple[str, Optional[str]]],
+) -> Dict[Any, List[Any]]:
+    merged: Dict[Any, List[Any]] = {}
+    for partials in per_source:
+        for key, values in partials.items():
+            current = merged.get(key)
+            if current is None:
+                merged[key] = list(values)
+                continue
+            position = 0
+            for function, _ in metrics:
+                width = 2 if function == "avg" else 1
+                for offset in range(width):
+                    old, new = current[position + offset], values[position + offset]
+                    if old is None or new is None:
+                        current[position + offset] = new if old is None else old
+                    elif function == "min":
+                        current[position + offset] = min(old, new, key=_sqlite_order)
+                    elif function == "max":
+                        current[position + offset] = max(old, new, key=_sqlite_order)
+                    else:
+                        current[position + offset] = old + new
+                position += width
+    return merged
+
+
+def aggregate_partners(
+    db: Session,
+    group_by: Optional[str],
+    metrics: List[str],
+    filters: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Compute count/sum/min/max/avg over fields inside `data`, in SQLite.
+
+    Args:
+        db: database session
+        group_by: dotted field to group on, or None for one overall row
+        metrics: specs such as "count" or "sum:revenue"
+        filters: clauses such as "tier:eq:gold", all of which must match
+
+    Returns:
+        One dict per group, keyed by the `group_by` field name and by each
+        metric spec, ordered by group value.
+
+    Raises:
+        ValueError: if a metric, filter or field name is invalid, or if
+            `group_by` equals a metric spec and would share its key.
+    """
+    parsed_metrics = [parse_metric(spec) for spec in metrics]
+    parsed_filters = [parse_filter(spec) for spec in filters or []]
+    if group_by is not None:
+        json_path(group_by)
+        if group_by in metrics:
+            raise ValueError(f"group_by {group_by!r} clashes with the metric of the same name")
+
+    store = get_partner_store()
+    if store is not None:
+        per_source = store.map_shards(
+            lambda shard, session: _aggregate_partials(
+                session, group_by, parsed_metrics, parsed_filters
+            )
+        )
+    else:
+        per_source = [_aggregate_partials(db, group_by, parsed_metrics, parsed_filters)]
+    merged = _merge_partials(per_source, parsed_metrics)
+
+    rows = []
+    for key in sorted(merged, key=_sqlite_order):
+        values = merged[key]
+        row: Dict[str, Any] = {group_by: key} if group_by else {}
+        position = 0
+        for spec, (function, _) in zip(metrics, parsed_metrics):
+            if function == "avg":
+                total, count = values[position], values[position + 1]
+                row[spec] = total / count if count else None
+                position += 2
+            else:
+                row[spec] = values[position]
+                position += 1
+        rows.append(row)
+    return rows
 
 
 def create_partner(
@@ -34,11 +297,18 @@ def create_partner(
     Returns:
         A dict with 'id' and the original 'data'.
     """
-    row = PartnerTable(data=json.dumps(data))
-    db.add(row)
-    db.commit()
-    db.refresh(row)
-    return {"id": row.id, "data": data}
+    store = get_partner_store()
+    if store is not None:
+        created = store.create_partner(data)
+    else:
+        row = PartnerTable(data=json.dumps(data))
+        db.add(row)
+        db.commit()
+        db.refresh(row)
+        created = {"id": row.id, "data": data}
+
+    list_cache.bump("partners")
+    return created
 
 
 def get_partner(
@@ -55,10 +325,15 @@ def get_partner(
     Returns:
         A dict with 'id' and parsed 'data', or None if not found.
     """
+    store = get_partner_store()
+    if store is not None:
+        return store.get_partner(partner_id)
+
     row = db.query(PartnerTable).filter(PartnerTable.id == partner_id).first()
     if not row:
         return None
-    return {"id": row.id, "data": json.loads(row.data)}
+    with phase("decode"):
+        return {"id": row.id, "data": json.loads(row.data)}
 
 
 def update_partner(
@@ -77,14 +352,23 @@ def update_partner(
     Returns:
         A dict with updated 'id' and 'data', or None if not found.
     """
-    row = db.query(PartnerTable).filter(PartnerTable.id == partner_id).first()
-    if not row:
-        return None
+    store = get_partner_store()
+    if store is not None:
+        updated = store.update_partner(partner_id, data)
+        if updated is None:
+            return None
+    else:
+        row = db.query(PartnerTable).filter(PartnerTable.id == partner_id).first()
+        if not row:
+            return None
 
-    row.data = json.dumps(data)
-    db.commit()
-    db.refresh(row)
-    return {"id": row.id, "data": data}
+        row.data = json.dumps(data)
+        db.commit()
+        db.refresh(row)
+        updated = {"id": row.id, "data": data}
+
+    list_cache.bump("partners")
+    return updated
 
 
 def delete_partner(db: Session, partner_id: int) -> bool:
@@ -98,10 +382,17 @@ def delete_partner(db: Session, partner_id: int) -> bool:
     Returns:
         True if deleted, False if no such partner existed.
     """
-    row = db.query(PartnerTable).filter(PartnerTable.id == partner_id).first()
-    if not row:
-        return False
+    store = get_partner_store()
+    if store is not None:
+        if not store.delete_partner(partner_id):
+            return False
+    else:
+        row = db.query(PartnerTable).filter(PartnerTable.id == partner_id).first()
+        if not row:
+            return False
+
+        db.delete(row)
+        db.commit()
 
-    db.delete(row)
-    db.commit()
+    list_cache.bump("partners")
     return True
@@ -0,0 +1,259 @@
+import contextvars
+import heapq
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, TypeVar
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..config import settings
+from ..db import Base, make_engine
+from ..diagnostics import phase
+from ..models import PartnerTable
+
+T = TypeVar("T")
+
+ROUTINGS = ("hash", "range")
+
+
+class PartnerShardStore:
+    """
+    Partner storage spread over several SQLite files.
+
+    Every shard keeps the normal `partners` table with its own local
+    autoincrement ids; the public id encodes the shard, so ids stay
+    globally unique and each lookup touches exactly one file:
+
+    - hash routing:  id = local_id * N + shard, shard = id % N
+    - range routing: id = shard * range_size + local_id, shard = id // range_size
+
+    New partners go to the shards round-robin, spreading the write locks.
+    Under range routing a shard whose local ids reach `range_size` is full
+    and is skipped from then on. The shard count and routing must not
+    change once data exists.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        routing: str = "hash",
+        range_size: int = 1 << 40,
+    ) -> None:
+        if not urls:
+            raise ValueError("at least one shard URL is required")
+        if routing not in ROUTINGS:
+            raise ValueError(f"unknown routing {routing!r}; expected one of {ROUTINGS}")
+        self.routing = routing
+        self.range_size = range_size
+        self.engines = [make_engine(url) for url in urls]
+        self._sessions = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for engine in self.engines
+        ]
+        self._next_shard = itertools.count()
+        self._full_shards: Set[int] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(urls), thread_name_prefix="partner-shard"
+        )
+
+    @property
+    def shard_count(self) -> int:
+        return len(self.engines)
+
+    def ensure_schema(self) -> None:
+        """
+        Create the partners table in every shard if it is missing.
+        """
+        for engine in self.engines:
+            Base.metadata.create_all(bind=engine, tables=[PartnerTable.__table__])
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for engine in self.engines:
+            engine.dispose()
+
+    def global_id(self, shard: int, local_id: int) -> int:
+        if self.routing == "hash":
+            return local_id * self.shard_count + shard
+        return shard * self.range_size + local_id
+
+    def locate(self, partner_id: int) -> Optional[Tuple[int, int]]:
+        """
+        Map a public id to (shard, local_id), or None if no shard can hold it.
+        """
+        if self.routing == "hash":
+            shard, local_id = partner_id % self.shard_count, partner_id // self.shard_count
+        else:
+            shard, local_id = divmod(partner_id, self.range_size)
+        if local_id < 1 or not 0 <= shard < self.shard_count:
+            return None
+        return shard, local_id
+
+    def map_shards(self, fn: Callable[[int, Session], T]) -> List[T]:
+        """
+        Call `fn(shard, session)` on every shard in parallel.
+
+        Returns:
+            The results, in shard order.
+        """
+        def run(shard: int) -> T:
+            with self._sessions[shard]() as session:
+                return fn(shard, session)
+
+        # One context copy per task: a Context cannot be entered by two
+        # threads at once, but all copies share the request's timings.
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, run, shard)
+            for shard in range(self.shard_count)
+        ]
+        return [future.result() for future in futures]
+
+    def _merge(self, per_shard: List[List[Tuple[int, str]]]) -> List[Dict[str, Any]]:
+        # Each shard's rows come back in local id order; local ids map
+        # monotonically to global ids, so a k-way merge keeps id order.
+        rows = heapq.merge(*per_shard, key=lambda row: row[0])
+        with phase("decode"):
+            return [{"id": pid, "data": json.loads(text)} for pid, text in rows]
+
+    def list_partners(self) -> List[Dict[str, Any]]:
+        """
+        Read every shard in parallel and merge the rows in id order.
+        """
+        def fetch(shard: int, session: Session) -> List[Tuple[int, str]]:
+            with phase("db"):
+                rows = (
+                    session.query(PartnerTable.id, PartnerTable.data)
+                    .order_by(PartnerTable.id)
+                    .all()
+                )
+            return [(self.global_id(shard, local_id), data) for local_id, data in rows]
+
+        return self._merge(self.map_shards(fetch))
+
+    def find_partners(self, path: str, value: Any) -> List[Dict[str, Any]]:
+        """
+        Return partners whose JSON value at `path` equals `value`, from all shards.
+        """
+        def fetch(shard: int, session: Session) -> List[Tuple[int, str]]:
+            with phase("db"):
+                rows = (
+                    session.query(PartnerTable.id, PartnerTable.data)
+                    .filter(func.json_extract(PartnerTable.data, path) == value)
+                    .order_by(PartnerTable.id)
+                    .all()
+                )
+            return [(self.global_id(shard, local_id), data) for local_id, data in rows]
+
+        return self._merge(self.map_shards(fetch))
+
+    def count_partners(self) -> int:
+        """
+        Count partners across all shards in parallel.
+        """
+        return sum(self.map_shards(lambda shard, session: session.query(PartnerTable).count()))
+
+    def create_partner(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store a new partner on the next shard in round-robin order.
+
+        Raises:
+            RuntimeError: if range routing has filled every shard.
+        """
+        start = next(self._next_shard)
+        for offset in range(self.shard_count):
+            shard = (start + offset) % self.shard_count
+            if shard in self._full_shards:
+                continue
+            with self._sessions[shard]() as session:
+                row = PartnerTable(data=json.dumps(data))
+                session.add(row)
+                session.flush()
+                local_id = row.id
+                if self.routing == "range" and local_id >= self.range_size:
+                    # The id would fall into the next shard's range.
+                    session.rollback()
+                    self._full_shards.add(shard)
+                    continue
+                session.commit()
+            return {"id": self.global_id(shard, local_id), "data": data}
+        raise RuntimeError(
+            f"all {self.shard_count} partner shards are full; "
+            "raise PARTNER_SHARD_RANGE_SIZE or add shards"
+        )
+
+    def get_partner(self, partner_id: int) -> Optional[Dict[str, Any]]:
+        location = self.locate(partner_id)
+        if location is None:
+            return None
+        shard, local_id = location
+        with self._sessions[shard]() as session:
+            row = session.get(PartnerTable, local_id)
+            if row is None:
+                return None
+            with phase("decode"):
+                return {"id": partner_id, "data": json.loads(row.data)}
+
+    def update_partner(self, partner_id: int, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        location = self.locate(partner_id)
+        if location is None:
+            return None
+        shard, local_id = location
+        with self._sessions[shard]() as session:
+            row = session.get(PartnerTable, local_id)
+            if row is None:
+                return None
+            row.data = json.dumps(data)
+            session.commit()
+            return {"id": partner_id, "data": data}
+
+    def delete_partner(self, partner_id: int) -> bool:
+        location = self.locate(partner_id)
+        if location is None:
+            return False
+        shard, local_id = location
+        with self._sessions[shard]() as session:
+            row = session.get(PartnerTable, local_id)
+            if row is None:
+                return False
+            session.delete(row)
+            session.commit()
+            return True
+
+
+_store: Optional[PartnerShardStore] = None
+_store_lock = threading.Lock()
+
+
+def get_partner_store() -> Optional[PartnerShardStore]:
+    """
+    Return the configured shard store, or None when sharding is disabled.
+    """
+    global _store
+    if settings.partner_shards <= 0:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = PartnerShardStore(
+                    [
+                        settings.partner_shard_url.format(shard=shard)
+                        for shard in range(settings.partner_shards)
+                    ],
+                    routing=settings.partner_shard_routing,
+                    range_size=settings.partner_shard_range_size,
+                )
+    return _store
+
+
+def close_partner_store() -> None:
+    """
+    Shut down the shard store's threads and connections, if one was built.
+    """
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
@@ -1,7 +1,28 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 
+from ..cache import list_cache
+from ..diagnostics import phase
 from ..models import UserTable
+from .user_write_buffer import get_status_buffer
+
+_USER_ROWS = select(UserTable.id, UserTable.status)
+
+
+def _pending_statuses() -> Dict[int, str]:
+    # Taken before querying, so a batch committing in between is never missed.
+    buffer = get_status_buffer()
+    return buffer.pending_snapshot() if buffer is not None else {}
+
+
+def _overlay(user: UserTable, pending: Optional[str]) -> UserTable:
+    if pending is not None:
+        # Shown to the caller without marking the instance dirty.
+        set_committed_value(user, "status", pending)
+    return user
 
 def get_all_users(db: Session) -> List[UserTable]:
     """
@@ -13,7 +34,34 @@ def get_all_users(db: Session) -> List[UserTable]:
     Returns:
         A list of UserTable instances.
     """
-    return db.query(UserTable).all()
+    pending = _pending_statuses()
+    with phase("db"):
+        users = db.query(UserTable).all()
+    if pending:
+        for user in users:
+            _overlay(user, pending.get(user.id))
+    return users
+
+
+def list_user_rows(db: Session) -> List[Tuple[int, str]]:
+    """
+    Retrieve all users as plain (id, status) tuples.
+
+    Uses a Core select, so no ORM instances are built or tracked in the
+    session's identity map.
+
+    Args:
+        db: database session
+
+    Returns:
+        A list of (id, status) tuples.
+    """
+    pending = _pending_statuses()
+    with phase("db"):
+        rows = db.execute(_USER_ROWS).all()
+    if pending:
+        return [(user_id, pending.get(user_id, status)) for user_id, status in rows]
+    return rows
 
 
 def create_user(db: Session, status: str) -> UserTable:
@@ -30,6 +78,7 @@ def create_user(db: Session, status: str) -> UserTable:
     user = UserTable(status=status)
     db.add(user)
     db.commit()
+    list_cache.bump("users")
     db.refresh(user)
     return user
 
@@ -45,7 +94,12 @@ def get_user(db: Session, user_id: int) -> Optional[UserTable]:
     Returns:
         The UserTable instance or None if not found.
     """
-    return db.query(UserTable).filter(UserTable.id == user_id).first()
+    buffer = get_status_buffer()
+    pending = buffer.pending_status(user_id) if buffer is not None else None
+    user = db.query(UserTable).filter(UserTable.id == user_id).first()
+    if user is None:
+        return None
+    return _overlay(user, pending)
 
 
 def update_user(
@@ -61,15 +115,31 @@ def update_user(
         user_id: primary key of the user
         status: new status to set
 
+    With write-behind enabled the new status is buffered rather than
+    committed, and a detached UserTable carrying it is returned.
+
     Returns:
         The updated UserTable instance or None if not found.
     """
+    buffer = get_status_buffer()
+    if buffer is not None:
+        # A queued entry means the user existed moments ago (deletes
+        # discard it); skip the read.
+        if not buffer.is_queued(user_id):
+            exists = db.query(UserTable.id).filter(UserTable.id == user_id).first()
+            if exists is None:
+                return None
+        buffer.put(user_id, status)
+        list_cache.bump("users")
+        return UserTable(id=user_id, status=status)
+
     user = get_user(db, user_id)
     if user is None:
         return None
 
     user.status = status
     db.commit()
+    list_cache.bump("users")
     db.refresh(user)
     return user
 
@@ -85,11 +155,16 @@ def delete_user(db: Session, user_id: int) -> bool:
     Returns:
         True if deleted, False if no user was found.
     """
+    buffer = get_status_buffer()
+    if buffer is not None:
+        buffer.discard(user_id)
+
     user = get_user(db, user_id)
     if user is None:
         return False
 
     db.delete(user)
     db.commit()
+    list_cache.bump("users")
     return True
 
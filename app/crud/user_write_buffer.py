@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from ..models import UserTable
+
+logger = logging.getLogger(__name__)
+
+# Core executemany: rows deleted meanwhile are simply not matched.
+_UPDATE_STATUS = (
+    update(UserTable.__table__)
+    .where(UserTable.__table__.c.id == bindparam("user_id"))
+    .values(status=bindparam("new_status"))
+)
+
+
+class StatusWriteBuffer:
+    """
+    Write-behind buffer for user status updates.
+
+    Repeated updates to the same user collapse in memory to the latest
+    value and are written in one batched transaction at most `window`
+    seconds later (or as soon as `max_pending` users are waiting).
+    Values stay visible to reads through `pending_status` until their
+    batch has committed.
+
+    The buffer is per process: with several workers, another worker may
+    read the old status until the window has passed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        window: float = 0.5,
+        max_pending: int = 10_000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.window = window
+        self.max_pending = max_pending
+        self._pending: Dict[int, str] = {}
+        self._flushing: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, user_id: int, status: str) -> None:
+        """
+        Record the latest status for a user; flushes inline when full.
+        """
+        with self._lock:
+            self._pending[user_id] = status
+            full = len(self._pending) >= self.max_pending
+        if full:
+            try:
+                self.flush()
+            except Exception:
+                pass  # logged in flush(); the values stay pending
+
+    def pending_status(self, user_id: int) -> Optional[str]:
+        """
+        Returns:
+            The not-yet-committed status for a user, or None.
+        """
+        with self._lock:
+            status = self._pending.get(user_id)
+            return status if status is not None else self._flushing.get(user_id)
+
+    def is_queued(self, user_id: int) -> bool:
+        """
+        Returns:
+            True if a status for the user waits for the next flush. Values
+            already being flushed do not count: the user may have been
+            deleted since.
+        """
+        with self._lock:
+            return user_id in self._pending
+
+    def pending_snapshot(self) -> Dict[int, str]:
+        """
+        Returns:
+            Every not-yet-committed status, keyed by user id.
+        """
+        with self._lock:
+            if not self._pending and not self._flushing:
+                return {}
+            return {**self._flushing, **self._pending}
+
+    def discard(self, user_id: int) -> None:
+        """
+        Drop any pending status for a user that is being deleted.
+        """
+        with self._lock:
+            self._pending.pop(user_id, None)
+
+    def flush(self) -> int:
+        """
+        Write all pending statuses in a single transaction.
+
+        Returns:
+            The number of users written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+            if not batch:
+                return 0
+            try:
+                with self.session_factory() as session:
+                    session.execute(
+                        _UPDATE_STATUS,
+                        [
+                            {"user_id": user_id, "new_status": status}
+                            for user_id, status in batch.items()
+                        ],
+                    )
+                    session.commit()
+            except Exception:
+                logger.exception("Flushing %d buffered user statuses failed", len(batch))
+                with self._lock:
+                    # Keep newer values that arrived during the failed flush.
+                    self._pending = {**batch, **self._pending}
+                raise
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            return len(batch)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.window)
+            if self._pending:
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception:
+                    pass  # logged in flush(); retried next window
+
+    def start(self) -> None:
+        """
+        Start periodic flushing on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Stop periodic flushing and write whatever is still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+_buffer: Optional[StatusWriteBuffer] = None
+
+
+def get_status_buffer() -> Optional[StatusWriteBuffer]:
+    """
+    Return the active write-behind buffer, or None for write-through.
+    """
+    return _buffer
+
+
+def set_status_buffer(buffer: Optional[StatusWriteBuffer]) -> None:
+    """
+    Install (or, with None, remove) the process-wide write-behind buffer.
+    """
+    global _buffer
+    _buffer = buffer
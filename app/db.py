@@ -1,17 +1,128 @@
+import threading
+from typing import Callable, List, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./data.db"
+from .config import settings
+
+SQLALCHEMY_DATABASE_URL = settings.database_url
+
+# Bump whenever the tables in models.py change shape. ensure_schema only
+# creates missing tables, so a bump also needs a migration for existing
+# databases; until one has run, startup refuses the older database.
+SCHEMA_VERSION = 1
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+_engine_hooks: List[Callable[[Engine], None]] = []
+_engines: List[Engine] = []
+
+
+def make_engine(url: str) -> Engine:
+    """
+    Create an engine configured like the app's, with all registered
+    on_engine_created hooks applied.
+    """
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    for hook in _engine_hooks:
+        hook(engine)
+    _engines.append(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    """
+    Return the application engine, creating it on first use.
+
+    Nothing touches the database until this is called, so importing the
+    app stays cheap.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = make_engine(SQLALCHEMY_DATABASE_URL)
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def on_engine_created(hook: Callable[[Engine], None]) -> None:
+    """
+    Register a callback (e.g. instrumentation) to run on every engine
+    made by make_engine, including ones that already exist.
+    """
+    _engine_hooks.append(hook)
+    for engine in _engines:
+        hook(engine)
+
+
+def __getattr__(name: str):
+    # Keeps `from app.db import engine` working without an import-time engine.
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def ensure_schema(engine: Engine) -> bool:
+    """
+    Create missing tables unless the database is already at SCHEMA_VERSION.
+
+    The version lives in SQLite's `user_version` header field, so only
+    the first worker of a deployment runs `create_all`; every other
+    worker pays for a single PRAGMA read. Creating the tables and
+    stamping the version happen in one write transaction, so workers
+    starting together on a fresh file wait for the first one instead of
+    colliding. Existing tables are never altered.
+
+    A new database is created with `auto_vacuum=INCREMENTAL` and switched
+    to WAL journaling, which the maintenance jobs rely on.
+
+    Returns:
+        True if tables were created, False if the schema was current.
+
+    Raises:
+        RuntimeError: if the database carries an older, non-zero version;
+            its tables would need migrating, which this does not do.
+    """
+    def current_version(conn) -> int:
+        version = conn.exec_driver_sql("PRAGMA user_version").scalar() or 0
+        if 0 < version < SCHEMA_VERSION:
+            raise RuntimeError(
+                f"database schema version {version} is older than {SCHEMA_VERSION}; "
+                "migrate it before starting the app"
+            )
+        return version
+
+    with engine.connect() as conn:
+        if current_version(conn) >= SCHEMA_VERSION:
+            return False
+
+    with engine.begin() as conn:
+        # Only takes effect before the first table exists, and must be
+        # issued outside a transaction.
+        conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+        # pysqlite leaves BEGIN to us; IMMEDIATE takes the write lock now,
+        # so the version is re-read only once no other worker can write.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        if current_version(conn) >= SCHEMA_VERSION:
+            return False  # another worker created the schema meanwhile
+        Base.metadata.create_all(bind=conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    with engine.connect() as conn:
+        # Persistent in the file; in-memory databases stay in "memory" mode.
+        conn.exec_driver_sql("PRAGMA journal_mode = WAL")
+    return True
+
+
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,241 @@
+import functools
+import inspect
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+TIMING_REQUEST_HEADER = b"x-server-timing"
+MAX_CAPTURED_STATEMENTS = 100
+
+
+class RequestTimings:
+    """
+    Per-request accumulator for phase durations and executed SQL.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        # Nesting depth per phase, so a nested block is not counted twice.
+        self.open: Dict[str, int] = {}
+        self.query_count = 0
+        self.statements: List[str] = []
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def breakdown(self, total: float) -> Dict[str, float]:
+        """
+        Split the request's wall time into db, decode, app, validate,
+        serialize and total, in milliseconds.
+
+        `validate` is whatever the route handler spent outside the endpoint
+        and the final render: request parsing, dependency resolution and
+        response-model validation/encoding. Serialization done inside the
+        endpoint (pre-encoded bodies) is taken out of `app` instead.
+        """
+        get = self.phases.get
+        endpoint = get("endpoint", 0.0)
+        handler = get("handler", endpoint)
+        db = get("db", 0.0)
+        decode = get("decode", 0.0)
+        serialize = get("serialize", 0.0)
+        endpoint_serialize = get("endpoint_serialize", 0.0)
+        phases = {
+            "db": db,
+            "decode": decode,
+            "app": max(endpoint - db - decode - endpoint_serialize, 0.0),
+            "validate": max(handler - endpoint - (serialize - endpoint_serialize), 0.0),
+            "serialize": serialize,
+            "total": total,
+        }
+        return {name: seconds * 1000.0 for name, seconds in phases.items()}
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """
+    Returns:
+        The RequestTimings of the request being served, or None when
+        diagnostics are off for it.
+    """
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Attribute the wrapped block's duration to `name` for the current request.
+
+    Blocks nested inside an open phase of the same name count only once.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    depth = timings.open.get(name, 0)
+    timings.open[name] = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if depth == 0:
+            elapsed = time.perf_counter() - start
+            timings.add(name, elapsed)
+            if name == "serialize" and timings.open.get("endpoint"):
+                timings.add("endpoint_serialize", elapsed)
+        timings.open[name] -= 1
+
+
+# pysqlite produces rows lazily, so these listeners only see the time spent
+# in cursor.execute. Queries returning many rows are wrapped in
+# phase("db") in app.crud to include fetching; inside such a block the
+# listeners just count the statement.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        context.diagnostics_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timings = _current.get()
+    if timings is None:
+        return
+    start = getattr(context, "diagnostics_start_time", None)
+    if start is not None and not timings.open.get("db"):
+        timings.add("db", time.perf_counter() - start)
+    timings.query_count += 1
+    if len(timings.statements) < MAX_CAPTURED_STATEMENTS:
+        timings.statements.append(statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach per-request SQL timing listeners to an engine (idempotent).
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse whose body rendering counts as the `serialize` phase.
+    """
+
+    def render(self, content: Any) -> bytes:
+        with phase("serialize"):
+            return super().render(content)
+
+
+def _timed_endpoint(call: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def async_wrapper(**kwargs: Any) -> Any:
+            with phase("endpoint"):
+                return await call(**kwargs)
+
+        return async_wrapper
+
+    @functools.wraps(call)
+    def wrapper(**kwargs: Any) -> Any:
+        with phase("endpoint"):
+            return call(**kwargs)
+
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that records how long the endpoint body and the whole route
+    handler take, so framework overhead can be told apart from app code.
+    """
+
+    def get_route_handler(self) -> Callable:
+        if self.dependant.call is not None:
+            self.dependant.call = _timed_endpoint(self.dependant.call)
+        original = super().get_route_handler()
+
+        async def handler(request):
+            with phase("handler"):
+                return await original(request)
+
+        return handler
+
+
+def _server_timing_header(timings: RequestTimings, total: float) -> bytes:
+    parts = [
+        f"{name};dur={ms:.3f}" for name, ms in timings.breakdown(total).items()
+    ]
+    parts.append(f'queries;desc="{timings.query_count}"')
+    return ", ".join(parts).encode("latin-1")
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware adding a `Server-Timing` header when requested and
+    logging the SQL of requests slower than `settings.slow_request_ms`.
+
+    A request opts in with an `X-Server-Timing: 1` header; setting
+    SERVER_TIMING_ENABLED turns the header on for every request.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_enabled = settings.server_timing_enabled or any(
+            name == TIMING_REQUEST_HEADER and value not in (b"", b"0")
+            for name, value in scope["headers"]
+        )
+        slow_ms = settings.slow_request_ms
+        if not header_enabled and slow_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            if header_enabled and message["type"] == "http.response.start":
+                total = time.perf_counter() - start
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing_header(timings, total)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - start) * 1000.0
+            if 0 < slow_ms <= total_ms:
+                logger.warning(
+                    "Slow request %s %s took %.1f ms (%d queries) %s\n%s",
+                    scope["method"],
+                    scope["path"],
+                    total_ms,
+                    timings.query_count,
+                    {k: round(v, 3) for k, v in timings.breakdown(total_ms / 1000.0).items()},
+                    "\n".join(timings.statements),
+                )
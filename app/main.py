@@ -1,19 +1,122 @@
+import time
+
+_import_started = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
 from fastapi import FastAPI
 
-from .db import Base, engine
+from .admission import AdmissionMiddleware
+from .config import settings
+from .crud.partner_shards import close_partner_store, get_partner_store
+from .crud.user_write_buffer import StatusWriteBuffer, set_status_buffer
+from .db import SessionLocal, ensure_schema, get_engine, on_engine_created
+from .diagnostics import ServerTimingMiddleware, TimedJSONResponse
+from .diagnostics import instrument_engine as instrument_diagnostics
+from .maintenance import LatencyMiddleware, MaintenanceScheduler
+from .metrics import MetricsMiddleware, instrument_engine
 from .routers.users import router as users_router
 from .routers.partners import router as partners_router
+from .routers.maintenance import router as maintenance_router
+from .routers.metrics import router as metrics_router
+
+_import_seconds = time.perf_counter() - _import_started
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the engine, set up the schema and start background database
+    maintenance (and user write-behind, if enabled) for the lifetime of
+    the app.
+    """
+    if settings.threadpool_size > 0:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        limiter.total_tokens = settings.threadpool_size
+
+    started = time.perf_counter()
+    engine = get_engine()
+    engine_ready = time.perf_counter()
+    schema_created = settings.auto_create_schema and ensure_schema(engine)
+    partner_store = get_partner_store()
+    if partner_store is not None and settings.auto_create_schema:
+        partner_store.ensure_schema()
+    schema_ready = time.perf_counter()
+
+    app.state.startup_timings = {
+        "imports_ms": _import_seconds * 1000.0,
+        "engine_ms": (engine_ready - started) * 1000.0,
+        "schema_ms": (schema_ready - engine_ready) * 1000.0,
+        "schema_created": schema_created,
+    }
+    if settings.startup_timing:
+        logger.info(
+            "startup: imports %.1f ms, engine %.1f ms, schema %.1f ms (created: %s)",
+            app.state.startup_timings["imports_ms"],
+            app.state.startup_timings["engine_ms"],
+            app.state.startup_timings["schema_ms"],
+            schema_created,
+        )
+
+    scheduler = None
+    if settings.maintenance_enabled:
+        scheduler = MaintenanceScheduler.from_settings(engine, settings)
+        scheduler.start()
+    app.state.maintenance = scheduler
 
+    status_buffer = None
+    if settings.user_write_behind:
+        status_buffer = StatusWriteBuffer(
+            SessionLocal,
+            window=settings.user_write_behind_window,
+            max_pending=settings.user_write_behind_max_pending,
+        )
+        set_status_buffer(status_buffer)
+        status_buffer.start()
+    try:
+        yield
+    finally:
+        # Each step runs even if an earlier one fails (e.g. the final flush).
+        try:
+            if status_buffer is not None:
+                # Flush before anything else shuts down.
+                try:
+                    await status_buffer.stop()
+                finally:
+                    set_status_buffer(None)
+        finally:
+            try:
+                if scheduler is not None:
+                    await scheduler.stop()
+            finally:
+                close_partner_store()
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="FastAPI CRUD",
     version="1.0.0",
     description="v1 endpoints for User and Partner CRUD",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse,
 )
 
+if settings.admission_limits:
+    app.add_middleware(AdmissionMiddleware)
+
+app.add_middleware(LatencyMiddleware)
+
+on_engine_created(instrument_diagnostics)
+app.add_middleware(ServerTimingMiddleware)
+
+if settings.metrics_enabled:
+    on_engine_created(instrument_engine)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 app.include_router(
     users_router,
     prefix="/api/v1",
@@ -24,4 +127,10 @@ app.include_router(
     partners_router,
     prefix="/api/v1",
     tags=["partners"],
-)
\ No newline at end of file
+)
+
+app.include_router(
+    maintenance_router,
+    prefix="/api/v1",
+    tags=["maintenance"],
+)
@@ -0,0 +1,328 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, IO, List, Optional
+
+from sqlalchemy.engine import Connection, Engine
+
+from .config import Settings
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """
+    Exponentially weighted moving average of recent request latency.
+
+    The average decays to zero once no request has been seen for
+    `idle_reset` seconds, so a quiet server is never considered busy.
+    """
+
+    def __init__(self, alpha: float = 0.2, idle_reset: float = 30.0) -> None:
+        self.alpha = alpha
+        self.idle_reset = idle_reset
+        self._value = 0.0
+        self._last_at = 0.0
+
+    def record(self, seconds: float) -> None:
+        self._value += self.alpha * (seconds - self._value)
+        self._last_at = time.monotonic()
+
+    def current_ms(self) -> float:
+        """
+        Returns:
+            The smoothed request latency in milliseconds.
+        """
+        if time.monotonic() - self._last_at > self.idle_reset:
+            return 0.0
+        return self._value * 1000.0
+
+
+request_latency = LatencyTracker()
+
+
+class LatencyMiddleware:
+    """
+    ASGI middleware feeding every HTTP request's duration to a LatencyTracker.
+    """
+
+    def __init__(self, app, tracker: LatencyTracker = request_latency) -> None:
+        self.app = app
+        self.tracker = tracker
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.tracker.record(time.perf_counter() - start)
+
+
+@dataclass
+class MaintenanceJob:
+    """
+    A single periodic maintenance statement and its bookkeeping.
+    """
+    name: str
+    interval: float
+    action: Callable[[Connection], Any]
+    next_due: float = 0.0
+    backoff: float = 0.0
+    last_run: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_result: Any = None
+    last_error: Optional[str] = None
+    skipped: int = 0
+
+
+def _optimize(conn: Connection) -> Any:
+    # A full ANALYZE is only needed the first time; afterwards
+    # PRAGMA optimize re-analyzes just the tables whose stats went stale.
+    has_stats = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).first()
+    if not has_stats:
+        conn.exec_driver_sql("ANALYZE")
+        return "analyze"
+    conn.exec_driver_sql("PRAGMA optimize")
+    return "optimize"
+
+
+def _checkpoint(mode: str) -> Callable[[Connection], Any]:
+    def action(conn: Connection) -> Any:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if journal_mode != "wal":
+            return f"skipped: journal_mode is {journal_mode}"
+        busy, wal_pages, checkpointed = conn.exec_driver_sql(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).first()
+        return {"busy": busy, "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+
+    return action
+
+
+def _incremental_vacuum(pages: int) -> Callable[[Connection], Any]:
+    def action(conn: Connection) -> Any:
+        if conn.exec_driver_sql("PRAGMA auto_vacuum").scalar() != 2:
+            return "skipped: auto_vacuum is not INCREMENTAL"
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        # pysqlite's execute() steps the pragma only once, freeing a single
+        # page; executescript runs it to completion.
+        conn.connection.dbapi_connection.executescript(
+            f"PRAGMA incremental_vacuum({int(pages)})"
+        )
+        after = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        return {"freelist_before": before, "freelist_after": after}
+
+    return action
+
+
+class MaintenanceScheduler:
+    """
+    Runs periodic SQLite maintenance in the background.
+
+    Each job is postponed with exponential backoff while the smoothed
+    request latency is above `latency_threshold_ms`.
+
+    Every worker process starts a scheduler, but only the one holding an
+    exclusive lock on `lock_path` runs jobs; the others keep trying, so
+    another worker takes over if the holder exits. Without a lock path
+    (or fcntl) every scheduler runs its jobs.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        jobs: List[MaintenanceJob],
+        latency: LatencyTracker = request_latency,
+        latency_threshold_ms: float = 200.0,
+        max_backoff: float = 600.0,
+        lock_path: Optional[str] = None,
+    ) -> None:
+        self.engine = engine
+        self.jobs = jobs
+        self.latency = latency
+        self.latency_threshold_ms = latency_threshold_ms
+        self.max_backoff = max_backoff
+        self.lock_path = lock_path if fcntl is not None else None
+        self._lock_file: Optional[IO] = None
+        self._task: Optional[asyncio.Task] = None
+
+        now = time.monotonic()
+        for job in self.jobs:
+            job.next_due = now + job.interval
+
+    @classmethod
+    def from_settings(cls, engine: Engine, settings: Settings) -> "MaintenanceScheduler":
+        """
+        Build a scheduler with the standard jobs; non-positive intervals are dropped.
+
+        File databases are locked through `<database>.maintenance.lock`.
+        """
+        candidates = [
+            MaintenanceJob("optimize", settings.maintenance_optimize_interval, _optimize),
+            MaintenanceJob(
+                "checkpoint_passive",
+                settings.maintenance_checkpoint_interval,
+                _checkpoint("PASSIVE"),
+            ),
+            MaintenanceJob(
+                "checkpoint_truncate",
+                settings.maintenance_truncate_interval,
+                _checkpoint("TRUNCATE"),
+            ),
+            MaintenanceJob(
+                "incremental_vacuum",
+                settings.maintenance_vacuum_interval,
+                _incremental_vacuum(settings.maintenance_vacuum_pages),
+            ),
+        ]
+        database = engine.url.database
+        return cls(
+            engine,
+            [job for job in candidates if job.interval > 0],
+            latency_threshold_ms=settings.maintenance_latency_threshold_ms,
+            max_backoff=settings.maintenance_max_backoff,
+            lock_path=f"{database}.maintenance.lock"
+            if database and database != ":memory:"
+            else None,
+        )
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock_path is None or self._lock_file is not None
+
+    def acquire_lock(self) -> bool:
+        """
+        Try (without blocking) to become the worker that runs the jobs.
+
+        Returns:
+            True if this scheduler holds the lock or needs none.
+        """
+        if self.is_leader:
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def release_lock(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()  # closing drops the flock
+            self._lock_file = None
+
+    def run_job(self, job: MaintenanceJob) -> None:
+        """
+        Execute a job immediately, recording its outcome.
+        """
+        start = time.perf_counter()
+        try:
+            with self.engine.connect() as conn:
+                job.last_result = job.action(conn)
+                conn.commit()
+            job.last_error = None
+        except Exception as exc:  # keep the scheduler alive on failure
+            job.last_error = repr(exc)
+            logger.exception("Maintenance job %s failed", job.name)
+        job.last_run = datetime.now(timezone.utc)
+        job.last_duration_ms = (time.perf_counter() - start) * 1000.0
+
+    def run_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Run every job whose time has come, unless the server is busy.
+
+        Args:
+            now: monotonic timestamp to schedule against (defaults to now)
+
+        Returns:
+            The names of the jobs that actually ran; none unless this
+            scheduler holds the maintenance lock.
+        """
+        if not self.acquire_lock():
+            return []
+        now = time.monotonic() if now is None else now
+        ran = []
+        for job in self.jobs:
+            if now < job.next_due:
+                continue
+            if self.latency.current_ms() > self.latency_threshold_ms:
+                job.skipped += 1
+                job.backoff = min(
+                    max(job.backoff * 2, 1.0, job.interval / 10), self.max_backoff
+                )
+                job.next_due = now + job.backoff
+                continue
+            self.run_job(job)
+            job.backoff = 0.0
+            job.next_due = now + job.interval
+            ran.append(job.name)
+        return ran
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Returns:
+            A JSON-serializable summary of every job's last run.
+        """
+        now = time.monotonic()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "leader": self.is_leader,
+            "request_latency_ms": round(self.latency.current_ms(), 3),
+            "jobs": [
+                {
+                    "name": job.name,
+                    "interval": job.interval,
+                    "last_run": job.last_run.isoformat() if job.last_run else None,
+                    "last_duration_ms": job.last_duration_ms,
+                    "last_result": job.last_result,
+                    "last_error": job.last_error,
+                    "skipped": job.skipped,
+                    "next_run_in": max(job.next_due - now, 0.0),
+                }
+                for job in self.jobs
+            ],
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            if self.jobs:
+                delay = min(job.next_due for job in self.jobs) - time.monotonic()
+            else:
+                delay = 60.0
+            await asyncio.sleep(min(max(delay, 0.0), 60.0))
+            await asyncio.to_thread(self.run_due)
+
+    def start(self) -> None:
+        """
+        Start the background loop on the running event loop.
+        """
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background loop, wait for it to finish and give up the
+        maintenance lock.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.release_lock()
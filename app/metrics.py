@@ -0,0 +1,171 @@
+import re
+import time
+from functools import lru_cache
+from typing import Tuple
+
+import anyio.to_thread
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being served.",
+    ["method"],
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "HTTP responses by route template and status code.",
+    ["method", "route", "status"],
+)
+
+SQL_LATENCY = Histogram(
+    "sql_statement_duration_seconds",
+    "SQL statement execution time by operation and table, excluding row fetching.",
+    ["operation", "table"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Database connections currently checked out of the pool.",
+)
+THREADPOOL_BUSY = Gauge(
+    "threadpool_busy_threads",
+    "Worker threads currently running sync route handlers.",
+)
+THREADPOOL_SIZE = Gauge(
+    "threadpool_max_threads",
+    "Capacity of the thread pool running sync route handlers.",
+)
+THREADPOOL_WAITING = Gauge(
+    "threadpool_waiting_tasks",
+    "Sync route handlers waiting for a free worker thread.",
+)
+ADMISSION_IN_PROGRESS = Gauge(
+    "admission_requests_in_progress",
+    "Admitted requests currently running, by route group.",
+    ["group"],
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Requests waiting for admission, by route group.",
+    ["group"],
+)
+ADMISSION_REJECTIONS = Counter(
+    "admission_rejections_total",
+    "Requests shed with a 503, by route group and reason.",
+    ["group", "reason"],
+)
+LIST_CACHE_LOOKUPS = Counter(
+    "list_cache_lookups_total",
+    "List response cache lookups by table and result.",
+    ["table", "result"],
+)
+
+_TABLE_RE = re.compile(
+    r"(?:^\s*UPDATE|\bFROM|\bINTO|\bTABLE)\s+\"?(?P<table>\w+)",
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=512)
+def statement_labels(statement: str) -> Tuple[str, str]:
+    """
+    Reduce a SQL statement to bounded-cardinality (operation, table) labels.
+
+    SQLAlchemy reuses the same parameterized statement strings, so the
+    cache makes this a dictionary lookup on the hot path.
+    """
+    words = statement.split(None, 1)
+    op = words[0].upper() if words else "UNKNOWN"
+    match = _TABLE_RE.search(statement)
+    return op, match.group("table").lower() if match else ""
+
+
+# The start time lives on the per-statement execution context, so a
+# statement that raises leaves nothing behind on the pooled connection.
+# Only cursor.execute is timed: pysqlite fetches rows lazily afterwards, so
+# large result sets spend most of their SQL time outside this histogram
+# (the Server-Timing `db` phase does include it).
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.metrics_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.metrics_start_time
+    SQL_LATENCY.labels(*statement_labels(statement)).observe(elapsed)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record):
+    POOL_CHECKED_OUT.dec()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Attach SQL timing and pool checkout listeners to an engine (idempotent).
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.pool, "checkout", _on_checkout)
+    event.listen(engine.pool, "checkin", _on_checkin)
+
+
+def update_threadpool_gauges() -> None:
+    """
+    Sample the anyio thread limiter used for sync route handlers.
+
+    Must be called from the event loop thread.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    stats = limiter.statistics()
+    THREADPOOL_BUSY.set(stats.borrowed_tokens)
+    THREADPOOL_SIZE.set(stats.total_tokens)
+    THREADPOOL_WAITING.set(stats.tasks_waiting)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency, in-flight requests and
+    response status counts, labelled by route template rather than raw path.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "<unmatched>"
+            REQUEST_LATENCY.labels(method, template).observe(elapsed)
+            RESPONSES.labels(method, template, str(status_code)).inc()
@@ -1,7 +1,7 @@
-from typing import Any, Dict, Optional
-from typing_extensions import Literal
+from typing import Any, Dict, List, Optional
+from typing_extensions import Literal, TypedDict
 
-from pydantic import BaseModel,ConfigDict
+from pydantic import BaseModel,ConfigDict, TypeAdapter
 from sqlalchemy import Column, Integer, String, Text
 
 from .db import Base
@@ -69,3 +69,26 @@ class Partner(BaseModel):
     data: Dict[str, Any]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserRecord(TypedDict):
+    """
+    Plain-dict form of User, serialized without model instances.
+    """
+    id: int
+    status: str
+
+
+# Built once at import: encodes already-validated rows straight to JSON bytes.
+user_list_adapter = TypeAdapter(List[UserRecord])
+
+
+class PartnerRecord(TypedDict):
+    """
+    Plain-dict form of Partner, as returned by partner_crud.
+    """
+    id: int
+    data: Dict[str, Any]
+
+
+partner_list_adapter = TypeAdapter(List[PartnerRecord])
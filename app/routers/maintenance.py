@@ -0,0 +1,21 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request
+
+router = APIRouter(
+    prefix="/maintenance",
+    tags=["maintenance"],
+)
+
+
+@router.get("/")
+def get_maintenance_status(request: Request) -> Dict[str, Any]:
+    """
+    Report the background maintenance scheduler's last run times.
+
+    Returns `enabled: false` when the scheduler is not running.
+    """
+    scheduler = getattr(request.app.state, "maintenance", None)
+    if scheduler is None:
+        return {"enabled": False, "jobs": []}
+    return {"enabled": True, **scheduler.status()}
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from ..metrics import update_threadpool_gauges
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """
+    Expose Prometheus metrics in the text exposition format.
+
+    Declared `async` so the thread-pool gauges are sampled on the event
+    loop without occupying one of the threads they measure.
+    """
+    update_threadpool_gauges()
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
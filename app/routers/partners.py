@@ -1,23 +1,30 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
 from ..crud.partner_crud import (
+    aggregate_partners as crud_aggregate_partners,
     create_partner as crud_create_partner,
     get_partner as crud_get_partner,
     list_partners as crud_list_partners,
     update_partner as crud_update_partner,
     delete_partner as crud_delete_partner,
 )
+from ..cache import list_cache
 from ..db import get_db
-from ..models import Partner
+from ..diagnostics import TimedRoute, phase
+from ..models import Partner, partner_list_adapter
 
 router = APIRouter(
     prefix="/partners",
     tags=["partners"],
+    route_class=TimedRoute,
 )
 
+aggregate_adapter = TypeAdapter(List[Dict[str, Any]])
+
 
 @router.get(
     "/",
@@ -26,14 +33,51 @@ router = APIRouter(
 )
 def get_all_partners(
     session: Session = Depends(get_db),
-) -> List[Partner]:
+) -> Response:
     """
     List all partners.
 
-    Returns an empty list if no partners exist.
+    Returns an empty list if no partners exist. The encoded body is cached
+    until the next write to partners.
+    """
+    def build() -> bytes:
+        partners = crud_list_partners(session)
+        with phase("serialize"):
+            return partner_list_adapter.dump_json(partners)
+
+    body = list_cache.get_or_build("partners", "all", build)
+    return Response(content=body, media_type="application/json")
+
+
+@router.get(
+    "/aggregate",
+    response_model=List[Dict[str, Any]],
+    status_code=status.HTTP_200_OK,
+)
+def aggregate_partners(
+    group_by: Optional[str] = None,
+    metric: List[str] = Query(["count"]),
+    filter: List[str] = Query([]),
+    session: Session = Depends(get_db),
+) -> Response:
+    """
+    Aggregate fields inside partner payloads without returning the payloads.
+
+    Example:
+        /partners/aggregate?group_by=region&metric=count&metric=sum:revenue&filter=tier:eq:gold
+
+    Metrics are count, sum, min, max and avg (`fn:field`); filters are
+    `field:op:value` with op one of eq, ne, gt, gte, lt, lte. Raises 400 on
+    an invalid metric, filter or field name. Not cached: every distinct
+    query string would otherwise be a new cache entry.
     """
-    partners = crud_list_partners(session)
-    return partners
+    try:
+        rows = crud_aggregate_partners(session, group_by, metric, filter)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    with phase("serialize"):
+        body = aggregate_adapter.dump_json(rows)
+    return Response(content=body, media_type="application/json")
 
 
 @router.post(
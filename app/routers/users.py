@@ -1,28 +1,42 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 
 from ..crud import user_crud
 
 from .. import db, models
+from ..cache import list_cache
+from ..diagnostics import TimedRoute, phase
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
+    route_class=TimedRoute,
 )
 
 @router.get(
     "/",
     response_model=List[models.User],
 )
-def read_users(session: Session = Depends(db.get_db)) -> List[models.User]:
+def read_users(session: Session = Depends(db.get_db)) -> Response:
     """
     Retrieve all users.
     Returns a list of users. If no users are found, returns an empty list.
-    Returns a list of users.
+
+    Rows are fetched as tuples and encoded directly to JSON; they were
+    validated on write, so the response model is only used for the schema.
+    The encoded body is cached until the next write to users.
     """
-    return user_crud.get_all_users(session)
+    def build() -> bytes:
+        rows = user_crud.list_user_rows(session)
+        with phase("serialize"):
+            return models.user_list_adapter.dump_json(
+                [{"id": user_id, "status": user_status} for user_id, user_status in rows]
+            )
+
+    body = list_cache.get_or_build("users", "all", build)
+    return Response(content=body, media_type="application/json")
 
 @router.post(
     "/",
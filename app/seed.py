@@ -0,0 +1,213 @@
+"""
+Bulk-load synthetic users and partners for load testing.
+
+Usage:
+    python -m app.seed --users 10000000 --partners 1000000 \\
+        --payload-bytes 1024 --shape nested --seed 42
+"""
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from .config import settings
+from .db import ensure_schema
+from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+SHAPES = ("flat", "nested")
+REGIONS = ("emea", "amer", "apac", "latam")
+TIERS = ("bronze", "silver", "gold", "platinum")
+TAGS = ("reseller", "oem", "distributor", "referral", "strategic", "trial")
+WORDS = (
+    "acme", "global", "systems", "labs", "partners", "digital", "cloud",
+    "data", "network", "solutions", "group", "works", "north", "blue",
+)
+FILLER = "abcdefghijklmnopqrstuvwxyz "
+
+# Connection-local settings that trade durability for load speed. They
+# only last for the seeding connection and never touch the file header.
+LOAD_PRAGMAS = (
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",  # 256 MiB
+    "PRAGMA locking_mode = EXCLUSIVE",
+)
+
+
+def make_partner_doc(rng: random.Random, size: int, shape: str = "flat") -> Dict[str, Any]:
+    """
+    Build a realistic partner document whose JSON is roughly `size` bytes.
+
+    Args:
+        rng: source of randomness (seed it for reproducible output)
+        size: target length of the JSON encoding; documents never shrink
+            below their fixed fields
+        shape: "flat" for scalar fields only, "nested" to add contact,
+            address and tag sub-structures
+
+    Returns:
+        A JSON-serializable dict.
+    """
+    name = " ".join(rng.choice(WORDS) for _ in range(2)).title()
+    doc: Dict[str, Any] = {
+        "name": name,
+        "region": rng.choice(REGIONS),
+        "tier": rng.choice(TIERS),
+        "revenue": round(rng.uniform(0, 1_000_000), 2),
+        "employees": rng.randint(1, 50_000),
+        "active": rng.random() < 0.8,
+    }
+    if shape == "nested":
+        slug = name.lower().replace(" ", "")
+        doc["contact"] = {
+            "email": f"ops@{slug}.example",
+            "phone": f"+1-555-{rng.randint(0, 9999):04d}",
+        }
+        doc["address"] = {
+            "city": rng.choice(WORDS).title(),
+            "zip": f"{rng.randint(0, 99999):05d}",
+        }
+        doc["tags"] = rng.sample(TAGS, rng.randint(1, 3))
+    elif shape != "flat":
+        raise ValueError(f"unknown shape {shape!r}; expected one of {SHAPES}")
+
+    padding = size - len(json.dumps(doc)) - len(', "notes": ""')
+    if padding > 0:
+        doc["notes"] = "".join(rng.choices(FILLER, k=padding))
+    return doc
+
+
+def generate_users(seed: int, count: int, active_ratio: float = 0.7) -> Iterator[Tuple[str]]:
+    """
+    Yield `count` (status,) rows, deterministically from `seed`.
+    """
+    rng = random.Random(f"{seed}:users")
+    for _ in range(count):
+        yield ("active" if rng.random() < active_ratio else "inactive",)
+
+
+def generate_partners(
+    seed: int,
+    count: int,
+    size: int = 512,
+    shape: str = "flat",
+) -> Iterator[Tuple[str]]:
+    """
+    Yield `count` (json_text,) rows, deterministically from `seed`.
+    """
+    rng = random.Random(f"{seed}:partners")
+    dumps = json.dumps
+    for _ in range(count):
+        yield (dumps(make_partner_doc(rng, size, shape)),)
+
+
+def _batches(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def sqlite_path(database_url: str) -> str:
+    """
+    Extract the file path from a sqlite:/// URL.
+
+    Raises:
+        ValueError: for non-SQLite or in-memory URLs.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or not url.database or url.database == ":memory:":
+        raise ValueError(f"seeding needs a SQLite file URL, got {database_url!r}")
+    return url.database
+
+
+def seed_database(
+    database_url: str,
+    users: int = 0,
+    partners: int = 0,
+    payload_bytes: int = 512,
+    shape: str = "flat",
+    seed: int = 0,
+    batch_size: int = 50_000,
+) -> Dict[str, float]:
+    """
+    Create the schema if needed and append generated rows.
+
+    All rows go in with executemany batches inside one transaction, on a
+    connection tuned with LOAD_PRAGMAS, so a failed load leaves the
+    database untouched.
+
+    Returns:
+        Row counts inserted and elapsed seconds.
+    """
+    engine = create_engine(database_url)
+    ensure_schema(engine)
+    engine.dispose()
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(sqlite_path(database_url), isolation_level=None)
+    try:
+        for pragma in LOAD_PRAGMAS:
+            conn.execute(pragma)
+        conn.execute("BEGIN")
+        try:
+            for batch in _batches(generate_users(seed, users), batch_size):
+                conn.executemany("INSERT INTO users (status) VALUES (?)", batch)
+            for batch in _batches(
+                generate_partners(seed, partners, payload_bytes, shape), batch_size
+            ):
+                conn.executemany("INSERT INTO partners (data) VALUES (?)", batch)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    return {
+        "users": users,
+        "partners": partners,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", default=settings.database_url)
+    parser.add_argument("--users", type=int, default=0)
+    parser.add_argument("--partners", type=int, default=0)
+    parser.add_argument("--payload-bytes", type=int, default=512)
+    parser.add_argument("--shape", choices=SHAPES, default="flat")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    result = seed_database(
+        args.database_url,
+        users=args.users,
+        partners=args.partners,
+        payload_bytes=args.payload_bytes,
+        shape=args.shape,
+        seed=args.seed,
+        batch_size=args.batch_size,
+    )
+    rows = result["users"] + result["partners"]
+    seconds = result["seconds"]
+    print(
+        f"inserted {result['users']} users and {result['partners']} partners "
+        f"in {seconds:.1f}s ({rows / seconds if seconds else 0:,.0f} rows/s)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional
+
+# Runs that differ in any of these measure different workloads.
+CONFIG_FIELDS = ("target", "users", "partners", "payload_bytes", "payload_shape", "concurrency")
+
+
+def compare(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    threshold: float = 10.0,
+) -> List[Dict[str, Any]]:
+    """
+    Compare the scenarios present in both reports.
+
+    A scenario regresses when its throughput drops, or its p99 latency
+    rises, by more than `threshold` percent.
+
+    Returns:
+        One row per common scenario with the relative changes (in percent)
+        and a `regression` flag.
+    """
+    rows = []
+    base_scenarios = baseline["scenarios"]
+    for name, new in candidate["scenarios"].items():
+        old = base_scenarios.get(name)
+        if old is None:
+            continue
+        throughput = _change(old["throughput_rps"], new["throughput_rps"])
+        p50 = _change(old["p50_ms"], new["p50_ms"])
+        p99 = _change(old["p99_ms"], new["p99_ms"])
+        rows.append({
+            "scenario": name,
+            "throughput_change": throughput,
+            "p50_change": p50,
+            "p99_change": p99,
+            "regression": throughput < -threshold or p99 > threshold,
+        })
+    return rows
+
+
+def config_differences(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> List[str]:
+    """
+    Returns:
+        One "field: old -> new" line per CONFIG_FIELDS entry that differs.
+    """
+    old, new = baseline.get("config", {}), candidate.get("config", {})
+    return [
+        f"{name}: {old.get(name)!r} -> {new.get(name)!r}"
+        for name in CONFIG_FIELDS
+        if old.get(name) != new.get(name)
+    ]
+
+
+def _change(old: float, new: float) -> float:
+    if not old:
+        return 0.0
+    return (new - old) / old * 100.0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="allowed throughput drop / p99 increase in percent (default: 10)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="compare even if the runs used different workloads",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    with open(args.candidate) as fh:
+        candidate = json.load(fh)
+
+    differences = config_differences(baseline, candidate)
+    if differences:
+        print("runs used different configurations:", file=sys.stderr)
+        for line in differences:
+            print(f"  {line}", file=sys.stderr)
+        if not args.force:
+            print("refusing to compare; pass --force to compare anyway", file=sys.stderr)
+            return 2
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{'scenario':<16} {'throughput':>11} {'p50':>9} {'p99':>9}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['scenario']:<16} {row['throughput_change']:>+10.1f}%"
+            f" {row['p50_change']:>+8.1f}% {row['p99_change']:>+8.1f}%{flag}"
+        )
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,416 @@
+"""
+Benchmark the CRUD API in-process (ASGI) or against a real uvicorn server.
+
+Usage:
+    python -m benchmarks.run --target asgi --users 100000 --partners 10000 \\
+        --payload-bytes 1024 --output results.json
+    python -m benchmarks.compare baseline.json results.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.seed import SHAPES, make_partner_doc, seed_database
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+USERS = "/api/v1/users/"
+PARTNERS = "/api/v1/partners/"
+
+# (method, path, json body)
+RequestSpec = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+@dataclass
+class BenchConfig:
+    """
+    Parameters of one benchmark run; stored alongside its results.
+    """
+    target: str = "asgi"
+    users: int = 10_000
+    partners: int = 1_000
+    payload_bytes: int = 512
+    payload_shape: str = "flat"
+    requests: int = 500
+    list_requests: int = 20
+    warmup: int = 20
+    concurrency: int = 8
+    seed: int = 1
+    scenarios: List[str] = field(default_factory=list)
+
+
+@dataclass
+class BenchContext:
+    """
+    State shared by scenario preparers: the database and a seeded RNG.
+    """
+    config: BenchConfig
+    db_path: str
+    rng: random.Random
+
+    def insert_rows(self, table: str, rows: List[tuple]) -> List[int]:
+        """
+        Insert rows directly (outside the timed section) and return their ids.
+        """
+        column = "status" if table == "users" else "data"
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                start = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+                conn.executemany(f"INSERT INTO {table} ({column}) VALUES (?)", rows)
+            return list(range(start + 1, start + 1 + len(rows)))
+        finally:
+            conn.close()
+
+
+def _status(rng: random.Random) -> str:
+    return rng.choice(("active", "inactive"))
+
+
+def _random_ids(ctx: BenchContext, count: int, n: int) -> List[int]:
+    return [ctx.rng.randint(1, count) for _ in range(n)]
+
+
+def _get_user(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [("GET", f"{USERS}{i}", None) for i in _random_ids(ctx, ctx.config.users, n)]
+
+
+def _list_users(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [("GET", USERS, None)] * n
+
+
+def _create_user(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [("POST", USERS, {"status": _status(ctx.rng)}) for _ in range(n)]
+
+
+def _update_user(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [
+        ("PUT", f"{USERS}{i}", {"status": _status(ctx.rng)})
+        for i in _random_ids(ctx, ctx.config.users, n)
+    ]
+
+
+def _delete_user(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    ids = ctx.insert_rows("users", [(_status(ctx.rng),) for _ in range(n)])
+    return [("DELETE", f"{USERS}{i}", None) for i in ids]
+
+
+def _partner_doc(ctx: BenchContext) -> Dict[str, Any]:
+    return make_partner_doc(ctx.rng, ctx.config.payload_bytes, ctx.config.payload_shape)
+
+
+def _get_partner(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [
+        ("GET", f"{PARTNERS}{i}", None)
+        for i in _random_ids(ctx, ctx.config.partners, n)
+    ]
+
+
+def _list_partners(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [("GET", PARTNERS, None)] * n
+
+
+def _create_partner(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [("POST", PARTNERS, {"data": _partner_doc(ctx)}) for _ in range(n)]
+
+
+def _update_partner(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    return [
+        ("PUT", f"{PARTNERS}{i}", {"data": _partner_doc(ctx)})
+        for i in _random_ids(ctx, ctx.config.partners, n)
+    ]
+
+
+def _delete_partner(ctx: BenchContext, n: int) -> List[RequestSpec]:
+    ids = ctx.insert_rows(
+        "partners", [(json.dumps(_partner_doc(ctx)),) for _ in range(n)]
+    )
+    return [("DELETE", f"{PARTNERS}{i}", None) for i in ids]
+
+
+# name -> (preparer, is_list, table that must be non-empty)
+SCENARIOS: Dict[str, Tuple[Callable[[BenchContext, int], List[RequestSpec]], bool, Optional[str]]] = {
+    "get_user": (_get_user, False, "users"),
+    "list_users": (_list_users, True, None),
+    "create_user": (_create_user, False, None),
+    "update_user": (_update_user, False, "users"),
+    "delete_user": (_delete_user, False, None),
+    "get_partner": (_get_partner, False, "partners"),
+    "list_partners": (_list_partners, True, None),
+    "create_partner": (_create_partner, False, None),
+    "update_partner": (_update_partner, False, "partners"),
+    "delete_partner": (_delete_partner, False, None),
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of `samples` (which need not be sorted).
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def peak_rss_kb(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Peak resident set size in KiB of this process, or of `pid` on Linux.
+    """
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status") as fh:
+                for line in fh:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1])
+        except OSError:
+            return None
+        return None
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux but bytes on macOS
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    specs: List[RequestSpec],
+    concurrency: int,
+) -> Tuple[List[float], int, float]:
+    """
+    Fire `specs` with up to `concurrency` requests in flight.
+
+    Returns:
+        Per-request latencies in seconds, the error count and wall time.
+    """
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(specs)
+
+    async def worker() -> None:
+        nonlocal errors
+        for method, path, body in pending:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_scenarios(
+    client: httpx.AsyncClient,
+    ctx: BenchContext,
+    server_pid: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run each selected scenario (warm-up first, then timed) and summarise it.
+    """
+    config = ctx.config
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in config.scenarios:
+        prepare, is_list, needs = SCENARIOS[name]
+        if needs and getattr(config, needs) == 0:
+            print(f"skipping {name}: no {needs} seeded", file=sys.stderr)
+            continue
+        count = config.list_requests if is_list else config.requests
+
+        await drive(client, prepare(ctx, min(config.warmup, count)), config.concurrency)
+        latencies, errors, wall = await drive(
+            client, prepare(ctx, count), config.concurrency
+        )
+        results[name] = {
+            "requests": len(latencies),
+            "errors": errors,
+            "throughput_rps": len(latencies) / wall if wall else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) * 1000.0 if latencies else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000.0,
+            "p99_ms": percentile(latencies, 99) * 1000.0,
+            # High-water mark of the serving process so far, not a
+            # per-scenario figure; in-process it includes seeding.
+            "rss_high_water_kb": peak_rss_kb(server_pid),
+        }
+        print(
+            f"{name:<16} {results[name]['throughput_rps']:>10.1f} req/s"
+            f"  p50 {results[name]['p50_ms']:>8.2f} ms"
+            f"  p99 {results[name]['p99_ms']:>8.2f} ms"
+            f"  errors {errors}",
+            file=sys.stderr,
+        )
+    return results
+
+
+def prepare_database(config: BenchConfig, db_path: str) -> None:
+    """
+    Create the schema and seed the configured number of rows.
+    """
+    seed_database(
+        f"sqlite:///{db_path}",
+        users=config.users,
+        partners=config.partners,
+        payload_bytes=config.payload_bytes,
+        shape=config.payload_shape,
+        seed=config.seed,
+    )
+
+
+async def _run_asgi(ctx: BenchContext) -> Dict[str, Dict[str, Any]]:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.db import get_db
+    from app.main import app
+
+    engine = create_engine(
+        f"sqlite:///{ctx.db_path}", connect_args={"check_same_thread": False}
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def _bench_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = _bench_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_scenarios(client, ctx)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run_uvicorn(ctx: BenchContext) -> Dict[str, Dict[str, Any]]:
+    port = _free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=ctx.config.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/openapi.json")
+                    break
+                except httpx.TransportError:
+                    if server.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            return await run_scenarios(client, ctx, server_pid=server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run(config: BenchConfig, db_path: str) -> Dict[str, Any]:
+    """
+    Seed `db_path`, run the benchmark and return the JSON-serializable report.
+    """
+    # Inherited by the uvicorn subprocess; the in-process run overrides get_db.
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    prepare_database(config, db_path)
+
+    ctx = BenchContext(config, db_path, random.Random(config.seed + 1))
+    runner = _run_asgi if config.target == "asgi" else _run_uvicorn
+    scenarios = asyncio.run(runner(ctx))
+    return {
+        "config": asdict(config),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "peak_rss_kb": peak_rss_kb(),
+        "scenarios": scenarios,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--users", type=int, default=BenchConfig.users)
+    parser.add_argument("--partners", type=int, default=BenchConfig.partners)
+    parser.add_argument("--payload-bytes", type=int, default=BenchConfig.payload_bytes)
+    parser.add_argument("--payload-shape", choices=SHAPES, default=BenchConfig.payload_shape)
+    parser.add_argument("--requests", type=int, default=BenchConfig.requests)
+    parser.add_argument("--list-requests", type=int, default=BenchConfig.list_requests)
+    parser.add_argument("--warmup", type=int, default=BenchConfig.warmup)
+    parser.add_argument("--concurrency", type=int, default=BenchConfig.concurrency)
+    parser.add_argument("--seed", type=int, default=BenchConfig.seed)
+    parser.add_argument(
+        "--scenario",
+        dest="scenarios",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run (repeatable; default: all)",
+    )
+    parser.add_argument("--db", help="database file to use (default: a temp file)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    config = BenchConfig(
+        target=args.target,
+        users=args.users,
+        partners=args.partners,
+        payload_bytes=args.payload_bytes,
+        payload_shape=args.payload_shape,
+        requests=args.requests,
+        list_requests=args.list_requests,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        seed=args.seed,
+        scenarios=args.scenarios or list(SCENARIOS),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.db")
+        if os.path.exists(db_path):
+            parser.error(f"{db_path} already exists; benchmarks need a fresh database")
+        report = run(config, db_path)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
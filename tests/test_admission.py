@@ -0,0 +1,83 @@
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+
+from app.admission import AdmissionGate, AdmissionMiddleware, route_group
+from app.config import settings
+from app.main import app
+
+
+@pytest.mark.parametrize(
+    "path, group",
+    [
+        ("/api/v1/users/", "users"),
+        ("/api/v1/partners/12", "partners"),
+        ("/api/v1/", None),
+        ("/metrics", None),
+    ],
+)
+def test_route_group(path: str, group) -> None:
+    assert route_group(path) == group
+
+
+def test_gate_queues_then_sheds() -> None:
+    gate = AdmissionGate("users", limit=1, max_queue=1, timeout=0.05)
+    outcomes = {}
+
+    async def main() -> None:
+        assert await gate.acquire() is None  # takes the only slot
+
+        async def queued() -> None:
+            outcomes["queued"] = await gate.acquire()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(queued)
+            await anyio.sleep(0.01)
+            assert gate.waiting == 1
+            outcomes["overflow"] = await gate.acquire()
+
+        gate.release()
+        assert await gate.acquire() is None
+
+    anyio.run(main)
+    assert outcomes == {"queued": "timeout", "overflow": "queue_full"}
+
+
+def test_gate_admits_waiter_when_slot_frees() -> None:
+    gate = AdmissionGate("users", limit=1, max_queue=1, timeout=1.0)
+
+    async def main() -> None:
+        assert await gate.acquire() is None
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(_release_soon, gate)
+            assert await gate.acquire() is None
+
+    anyio.run(main)
+
+
+async def _release_soon(gate: AdmissionGate) -> None:
+    await anyio.sleep(0.01)
+    gate.release()
+
+
+@pytest.fixture
+def limited_client(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(settings, "admission_limits", {"users": 0})
+    monkeypatch.setattr(settings, "admission_queue_size", 0)
+    monkeypatch.setattr(settings, "admission_retry_after", 7)
+    return TestClient(AdmissionMiddleware(app))
+
+
+def test_middleware_rejects_with_retry_after(limited_client: TestClient) -> None:
+    r = limited_client.get("/api/v1/users/")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "7"
+
+    # Groups without a limit are untouched.
+    assert limited_client.get("/api/v1/partners/").status_code == 200
+
+
+def test_rejections_are_counted(limited_client: TestClient, client: TestClient) -> None:
+    limited_client.get("/api/v1/users/")
+    body = client.get("/metrics").text
+    assert 'admission_rejections_total{group="users",reason="queue_full"}' in body
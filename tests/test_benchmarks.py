@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from benchmarks.compare import compare, config_differences, main
+from benchmarks.run import percentile
+
+
+def test_percentile_nearest_rank() -> None:
+    samples = [float(i) for i in range(100, 0, -1)]
+    assert percentile(samples, 50) == 50.0
+    assert percentile(samples, 99) == 99.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([], 99) == 0.0
+
+
+def _report(**scenarios) -> dict:
+    return {
+        "scenarios": {
+            name: {"throughput_rps": rps, "p50_ms": p99 / 2, "p99_ms": p99}
+            for name, (rps, p99) in scenarios.items()
+        }
+    }
+
+
+def test_compare_flags_regressions() -> None:
+    baseline = _report(get_user=(1000, 10.0), list_users=(50, 100.0), gone=(1, 1.0))
+    candidate = _report(get_user=(850, 10.0), list_users=(52, 130.0), new=(1, 1.0))
+
+    rows = {row["scenario"]: row for row in compare(baseline, candidate, threshold=10)}
+
+    assert set(rows) == {"get_user", "list_users"}
+    assert rows["get_user"]["throughput_change"] == pytest.approx(-15.0)
+    assert rows["get_user"]["regression"] is True
+    assert rows["list_users"]["p99_change"] == pytest.approx(30.0)
+    assert rows["list_users"]["regression"] is True
+    assert not any(row["regression"] for row in compare(baseline, baseline))
+
+
+def test_compare_refuses_different_workloads(tmp_path) -> None:
+    config = {"target": "asgi", "users": 1000, "partners": 100, "payload_bytes": 512,
+              "payload_shape": "flat", "concurrency": 8, "seed": 1}
+    baseline = {**_report(get_user=(1000, 10.0)), "config": config}
+    candidate = {**_report(get_user=(1000, 10.0)), "config": {**config, "users": 10, "seed": 2}}
+
+    assert config_differences(baseline, candidate) == ["users: 1000 -> 10"]
+    assert config_differences(baseline, baseline) == []
+
+    paths = []
+    for name, report in (("before", baseline), ("after", candidate)):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(report))
+        paths.append(str(path))
+    assert main(paths) == 2
+    assert main(paths + ["--force"]) == 0
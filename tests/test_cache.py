@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.cache import ListResponseCache, list_cache
+from app.config import settings
+
+
+@pytest.fixture
+def enabled(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "list_cache_enabled", True)
+    monkeypatch.setattr(settings, "list_cache_max_age", 0)
+    list_cache.clear()
+    yield
+    list_cache.clear()
+
+
+def _counting_builder(cache: ListResponseCache, table: str = "users"):
+    calls = []
+
+    def build() -> bytes:
+        calls.append(1)
+        return b"body-%d" % len(calls)
+
+    return calls, lambda: cache.get_or_build(table, "all", build)
+
+
+def test_disabled_cache_always_builds() -> None:
+    calls, get = _counting_builder(ListResponseCache())
+    get()
+    get()
+    assert len(calls) == 2
+
+
+def test_hits_until_generation_bumps(enabled) -> None:
+    cache = ListResponseCache()
+    calls, get = _counting_builder(cache)
+
+    assert get() == b"body-1"
+    assert get() == b"body-1"
+    cache.bump("partners")  # other tables do not invalidate
+    assert get() == b"body-1"
+
+    cache.bump("users")
+    assert get() == b"body-2"
+    assert len(calls) == 2
+
+
+def test_write_during_build_is_not_cached(enabled) -> None:
+    cache = ListResponseCache()
+
+    def racing_build() -> bytes:
+        cache.bump("users")  # a write commits while the list is being read
+        return b"stale"
+
+    assert cache.get_or_build("users", "all", racing_build) == b"stale"
+    assert cache.get_or_build("users", "all", lambda: b"fresh") == b"fresh"
+
+
+def test_entries_expire_after_max_age(enabled, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "list_cache_max_age", 1e-9)
+    calls, get = _counting_builder(ListResponseCache())
+    get()
+    get()
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize(
+    "base, payload",
+    [
+        ("/api/v1/users/", {"status": "active"}),
+        ("/api/v1/partners/", {"data": {"region": "emea"}}),
+    ],
+)
+def test_list_endpoints_serve_cached_bytes_until_a_write(
+    enabled, client: TestClient, base: str, payload: dict
+) -> None:
+    assert client.get(base).json() == []
+    assert client.get(base).json() == []
+
+    created = client.post(base, json=payload).json()
+    assert client.get(base).json() == [created]
+
+    client.delete(f"{base}{created['id']}")
+    assert client.get(base).json() == []
+
+    body = client.get("/metrics").text
+    table = base.strip("/").split("/")[-1]
+    assert f'list_cache_lookups_total{{result="hit",table="{table}"}}' in body
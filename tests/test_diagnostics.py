@@ -0,0 +1,104 @@
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.diagnostics import RequestTimings, _current, instrument_engine, phase
+from tests.conftest import engine
+
+BASE = "/api/v1/partners"
+
+
+@pytest.fixture(autouse=True)
+def _instrumented() -> None:
+    instrument_engine(engine)
+
+
+def _parse(header: str) -> dict:
+    entries = {}
+    for part in header.split(", "):
+        name, _, value = part.partition(";")
+        entries[name] = value
+    return entries
+
+
+def test_server_timing_is_opt_in(client: TestClient) -> None:
+    r = client.get(f"{BASE}/")
+    assert "server-timing" not in r.headers
+
+
+def test_server_timing_header_breakdown(client: TestClient) -> None:
+    created = client.post(f"{BASE}/", json={"data": {"a": 1}}).json()
+
+    r = client.get(f"{BASE}/{created['id']}", headers={"X-Server-Timing": "1"})
+    assert r.status_code == 200
+
+    entries = _parse(r.headers["server-timing"])
+    assert set(entries) == {
+        "db", "decode", "app", "validate", "serialize", "total", "queries",
+    }
+    assert entries["queries"] == 'desc="1"'
+    assert float(entries["total"].removeprefix("dur=")) > 0
+
+
+def test_server_timing_enabled_globally(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "server_timing_enabled", True)
+    r = client.get("/api/v1/users/9999")
+    assert r.status_code == 404
+    assert "queries;desc=" in r.headers["server-timing"]
+
+
+def test_slow_request_log_captures_sql(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    monkeypatch.setattr(settings, "slow_request_ms", 1e-6)
+    with caplog.at_level(logging.WARNING, logger="app.diagnostics"):
+        r = client.get(f"{BASE}/")
+    assert r.status_code == 200
+    assert "server-timing" not in r.headers
+
+    [record] = caplog.records
+    assert "Slow request GET /api/v1/partners/" in record.getMessage()
+    assert "FROM partners" in record.getMessage()
+
+
+def test_db_phase_counts_fetching_once(db_session) -> None:
+    timings = RequestTimings()
+    token = _current.set(timings)
+    start = time.perf_counter()
+    try:
+        with phase("db"):
+            db_session.connection().exec_driver_sql("SELECT 1").all()
+            with phase("db"):
+                time.sleep(0.01)
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+    finally:
+        _current.reset(token)
+
+    assert timings.query_count == 1
+    assert 0.02 <= timings.phases["db"] <= elapsed
+
+
+def test_serialize_inside_endpoint_is_not_counted_as_app() -> None:
+    timings = RequestTimings()
+    token = _current.set(timings)
+    try:
+        with phase("handler"):
+            with phase("endpoint"):
+                with phase("serialize"):
+                    time.sleep(0.02)
+    finally:
+        _current.reset(token)
+
+    breakdown = timings.breakdown(timings.phases["handler"])
+    assert breakdown["serialize"] >= 20
+    assert breakdown["app"] < 10
+    parts = sum(breakdown[name] for name in ("db", "decode", "app", "validate", "serialize"))
+    assert parts == pytest.approx(breakdown["total"], abs=1.0)
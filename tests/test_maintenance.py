@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.config import Settings
+from app.db import ensure_schema
+from app.maintenance import LatencyTracker, MaintenanceJob, MaintenanceScheduler
+from app.models import PartnerTable
+from tests.conftest import engine
+
+
+def _scheduler(tracker: LatencyTracker) -> MaintenanceScheduler:
+    calls = []
+    job = MaintenanceJob("noop", 10.0, lambda conn: calls.append(1) or len(calls))
+    return MaintenanceScheduler(
+        engine, [job], latency=tracker, latency_threshold_ms=50.0
+    )
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'maintained.db'}")
+    ensure_schema(engine)
+    yield engine
+    engine.dispose()
+
+
+def _run_standard_jobs(engine) -> dict:
+    scheduler = MaintenanceScheduler.from_settings(engine, Settings())
+    for job in scheduler.jobs:
+        scheduler.run_job(job)
+        assert job.last_error is None, job.name
+        assert job.last_run is not None
+    return {job["name"]: job["last_result"] for job in scheduler.status()["jobs"]}
+
+
+def test_standard_jobs_have_an_effect(file_engine) -> None:
+    with file_engine.begin() as conn:
+        conn.execute(
+            PartnerTable.__table__.insert(), [{"data": "x" * 2000} for _ in range(500)]
+        )
+        conn.execute(PartnerTable.__table__.delete())
+
+    results = _run_standard_jobs(file_engine)
+
+    assert list(results) == [
+        "optimize",
+        "checkpoint_passive",
+        "checkpoint_truncate",
+        "incremental_vacuum",
+    ]
+    assert results["optimize"] == "analyze"
+    with file_engine.connect() as conn:
+        assert conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+        ).first()
+
+    assert results["checkpoint_passive"]["busy"] == 0
+    assert results["checkpoint_passive"]["wal_pages"] > 0
+    assert results["checkpoint_truncate"]["wal_pages"] == 0
+
+    vacuum = results["incremental_vacuum"]
+    assert vacuum["freelist_before"] > vacuum["freelist_after"]
+
+
+def test_jobs_report_skips_on_unsuitable_databases() -> None:
+    results = _run_standard_jobs(engine)  # in-memory: no WAL, no auto_vacuum
+    assert results["checkpoint_passive"].startswith("skipped")
+    assert results["checkpoint_truncate"].startswith("skipped")
+    assert results["incremental_vacuum"].startswith("skipped")
+
+
+def test_only_one_scheduler_per_database_runs_jobs(file_engine) -> None:
+    first = MaintenanceScheduler.from_settings(file_engine, Settings())
+    second = MaintenanceScheduler.from_settings(file_engine, Settings())
+    assert first.lock_path is not None
+    now = max(job.next_due for job in first.jobs + second.jobs)
+
+    assert first.run_due(now=now)
+    assert second.run_due(now=now) == []
+    assert second.status()["leader"] is False
+
+    asyncio.run(first.stop())
+    assert second.run_due(now=now + 10 ** 6)
+    assert second.status()["leader"] is True
+    asyncio.run(second.stop())
+
+
+def test_run_due_respects_schedule() -> None:
+    scheduler = _scheduler(LatencyTracker())
+    job = scheduler.jobs[0]
+
+    assert scheduler.run_due(now=job.next_due - 1) == []
+    assert scheduler.run_due(now=job.next_due) == ["noop"]
+    assert job.last_result == 1
+
+
+def test_run_due_backs_off_while_latency_is_high() -> None:
+    tracker = LatencyTracker(alpha=1.0)
+    tracker.record(1.0)  # 1000 ms, well above the threshold
+    scheduler = _scheduler(tracker)
+    job = scheduler.jobs[0]
+
+    due = job.next_due
+    assert scheduler.run_due(now=due) == []
+    assert job.skipped == 1
+    first_backoff = job.backoff
+
+    assert scheduler.run_due(now=job.next_due) == []
+    assert job.backoff == pytest.approx(first_backoff * 2)
+
+    tracker.record(0.0)
+    assert scheduler.run_due(now=job.next_due) == ["noop"]
+    assert job.backoff == 0.0
+
+
+def test_maintenance_status_endpoint(client: TestClient) -> None:
+    r = client.get("/api/v1/maintenance/")
+    assert r.status_code == 200
+    assert r.json() == {"enabled": False, "jobs": []}
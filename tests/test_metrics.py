@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.metrics import instrument_engine, statement_labels
+from tests.conftest import engine
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        ("SELECT users.id, users.status FROM users WHERE users.id = ?", ("SELECT", "users")),
+        ("INSERT INTO partners (data) VALUES (?)", ("INSERT", "partners")),
+        ("UPDATE users SET status=? WHERE users.id = ?", ("UPDATE", "users")),
+        ("DELETE FROM partners WHERE partners.id = ?", ("DELETE", "partners")),
+        ("PRAGMA optimize", ("PRAGMA", "")),
+    ],
+)
+def test_statement_labels(statement, expected) -> None:
+    assert statement_labels(statement) == expected
+
+
+def test_metrics_endpoint_reports_routes_and_sql(client: TestClient) -> None:
+    instrument_engine(engine)
+    instrument_engine(engine)  # idempotent
+
+    created = client.post("/api/v1/users/", json={"status": "active"}).json()
+    client.get(f"/api/v1/users/{created['id']}")
+    client.get("/api/v1/users/9999")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    body = r.text
+
+    assert (
+        'http_responses_total{method="GET",route="/api/v1/users/{user_id}",status="404"}'
+        in body
+    )
+    assert 'http_request_duration_seconds_count{method="POST",route="/api/v1/users/"}' in body
+    assert 'sql_statement_duration_seconds_count{operation="INSERT",table="users"}' in body
+    assert "db_pool_connections_checked_out" in body
+    assert "threadpool_max_threads" in body
+
+
+def test_failed_statements_leave_no_timing_state(db_session) -> None:
+    instrument_engine(engine)
+    connection = db_session.connection()
+    before = {key: repr(value) for key, value in connection.info.items()}
+
+    with pytest.raises(Exception):
+        connection.exec_driver_sql("SELECT * FROM no_such_table")
+    connection.exec_driver_sql("SELECT 1")
+
+    assert {key: repr(value) for key, value in connection.info.items()} == before
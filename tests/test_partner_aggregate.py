@@ -0,0 +1,150 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.cache import list_cache
+from app.config import settings
+from app.crud import partner_shards
+from app.crud.partner_crud import aggregate_partners, create_partner, parse_filter
+
+PARTNERS = [
+    {"region": "emea", "tier": "gold", "revenue": 100},
+    {"region": "emea", "tier": "silver", "revenue": 50},
+    {"region": "apac", "tier": "gold", "revenue": 300},
+    {"region": "apac", "tier": "gold", "revenue": 100},
+    {"region": "amer", "tier": "bronze"},
+]
+
+
+def test_group_by_with_every_metric(db_session: Session) -> None:
+    for data in PARTNERS:
+        create_partner(db_session, data)
+
+    rows = aggregate_partners(
+        db_session,
+        "region",
+        ["count", "sum:revenue", "min:revenue", "max:revenue", "avg:revenue"],
+    )
+    assert rows == [
+        {"region": "amer", "count": 1, "sum:revenue": None, "min:revenue": None,
+         "max:revenue": None, "avg:revenue": None},
+        {"region": "apac", "count": 2, "sum:revenue": 400, "min:revenue": 100,
+         "max:revenue": 300, "avg:revenue": 200.0},
+        {"region": "emea", "count": 2, "sum:revenue": 150, "min:revenue": 50,
+         "max:revenue": 100, "avg:revenue": 75.0},
+    ]
+
+
+def test_filters_and_overall_row(db_session: Session) -> None:
+    for data in PARTNERS:
+        create_partner(db_session, data)
+
+    assert aggregate_partners(db_session, None, ["count", "sum:revenue"], ["tier:eq:gold"]) == [
+        {"count": 3, "sum:revenue": 500}
+    ]
+    assert aggregate_partners(
+        db_session, "tier", ["count"], ["revenue:gte:100", "region:ne:apac"]
+    ) == [{"tier": "gold", "count": 1}]
+
+
+def test_parse_filter_reads_json_scalars() -> None:
+    assert parse_filter("revenue:gt:10") == ("revenue", "gt", 10)
+    assert parse_filter("active:eq:true") == ("active", "eq", True)
+    assert parse_filter("name:eq:a:b") == ("name", "eq", "a:b")
+    assert parse_filter('code:eq:"42"') == ("code", "eq", "42")
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"metric": "median:revenue"},
+        {"metric": "sum"},
+        {"group_by": "region') OR 1=1 --"},
+        {"filter": "tier:like:gold"},
+        {"filter": "tier"},
+        {"group_by": "count", "metric": "count"},
+    ],
+)
+def test_invalid_specs_are_rejected(client: TestClient, params) -> None:
+    response = client.get("/api/v1/partners/aggregate", params=params)
+    assert response.status_code == 400
+
+
+def test_aggregate_endpoint(client: TestClient) -> None:
+    for data in PARTNERS:
+        client.post("/api/v1/partners/", json={"data": data})
+
+    response = client.get(
+        "/api/v1/partners/aggregate",
+        params={"group_by": "region", "metric": ["count", "avg:revenue"], "filter": "tier:eq:gold"},
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {"region": "apac", "count": 2, "avg:revenue": 200.0},
+        {"region": "emea", "count": 1, "avg:revenue": 100.0},
+    ]
+    assert client.get("/api/v1/partners/aggregate").json() == [{"count": 5}]
+
+
+def test_sharded_partials_are_merged(
+    db_session: Session, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "partner_shards", 3)
+    monkeypatch.setattr(
+        settings, "partner_shard_url", f"sqlite:///{tmp_path}/shard-{{shard}}.db"
+    )
+    store = partner_shards.get_partner_store()
+    store.ensure_schema()
+    try:
+        for data in PARTNERS:
+            create_partner(db_session, data)
+
+        rows = aggregate_partners(
+            db_session, "region", ["count", "min:revenue", "max:revenue", "avg:revenue"]
+        )
+        assert rows == [
+            {"region": "amer", "count": 1, "min:revenue": None, "max:revenue": None,
+             "avg:revenue": None},
+            {"region": "apac", "count": 2, "min:revenue": 100, "max:revenue": 300,
+             "avg:revenue": 200.0},
+            {"region": "emea", "count": 2, "min:revenue": 50, "max:revenue": 100,
+             "avg:revenue": 75.0},
+        ]
+    finally:
+        partner_shards.close_partner_store()
+
+
+def test_aggregates_are_not_cached(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "list_cache_enabled", True)
+    list_cache.clear()
+    for n in range(3):
+        client.get("/api/v1/partners/aggregate", params={"filter": f"revenue:gte:{n}"})
+    assert not any(key[0] == "partners" for key in list_cache._entries)
+
+
+def test_sharded_min_max_follow_sqlite_type_order(
+    db_session: Session, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    mixed = [{"g": "a", "v": 1}, {"g": "a", "v": "x"}, {"g": 2, "v": 5}, {"g": "b", "v": 0}]
+    for data in mixed:
+        create_partner(db_session, data)
+    expected = aggregate_partners(db_session, "g", ["min:v", "max:v"])
+
+    monkeypatch.setattr(settings, "partner_shards", 2)
+    monkeypatch.setattr(
+        settings, "partner_shard_url", f"sqlite:///{tmp_path}/shard-{{shard}}.db"
+    )
+    store = partner_shards.get_partner_store()
+    store.ensure_schema()
+    try:
+        for data in mixed:
+            create_partner(db_session, data)
+        rows = aggregate_partners(db_session, "g", ["min:v", "max:v"])
+    finally:
+        partner_shards.close_partner_store()
+
+    assert rows == expected == [
+        {"g": 2, "min:v": 5, "max:v": 5},
+        {"g": "a", "min:v": 1, "max:v": "x"},
+        {"g": "b", "min:v": 0, "max:v": 0},
+    ]
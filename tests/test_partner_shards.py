@@ -0,0 +1,145 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import partner_shards
+from app.crud.partner_crud import (
+    count_partners,
+    create_partner,
+    find_partners,
+    list_partners,
+)
+from app.crud.partner_shards import PartnerShardStore
+from app.models import PartnerTable
+
+
+def make_store(tmp_path, routing: str, shards: int = 3, range_size: int = 1000) -> PartnerShardStore:
+    urls = [f"sqlite:///{tmp_path / f'partners-{i}.db'}" for i in range(shards)]
+    store = PartnerShardStore(urls, routing=routing, range_size=range_size)
+    store.ensure_schema()
+    return store
+
+
+@pytest.fixture(params=["hash", "range"])
+def store(request, tmp_path):
+    store = make_store(tmp_path, request.param)
+    yield store
+    store.close()
+
+
+def test_ids_are_unique_and_route_back_to_their_shard(store: PartnerShardStore) -> None:
+    created = [store.create_partner({"n": n}) for n in range(10)]
+    ids = [p["id"] for p in created]
+    assert len(set(ids)) == 10
+
+    shards = {store.locate(pid)[0] for pid in ids}
+    assert shards == {0, 1, 2}  # round-robin spreads the writes
+
+    for partner in created:
+        assert store.get_partner(partner["id"]) == partner
+
+
+def test_list_count_and_find_fan_out(store: PartnerShardStore) -> None:
+    created = [
+        store.create_partner({"n": n, "region": "emea" if n % 2 else "apac"})
+        for n in range(7)
+    ]
+
+    assert store.list_partners() == sorted(created, key=lambda p: p["id"])
+    assert store.count_partners() == 7
+
+    emea = store.find_partners("$.region", "emea")
+    assert sorted(p["data"]["n"] for p in emea) == [1, 3, 5]
+
+
+def test_update_and_delete_touch_one_shard(store: PartnerShardStore) -> None:
+    partner = store.create_partner({"v": 1})
+    assert store.update_partner(partner["id"], {"v": 2}) == {"id": partner["id"], "data": {"v": 2}}
+    assert store.get_partner(partner["id"])["data"] == {"v": 2}
+
+    assert store.delete_partner(partner["id"]) is True
+    assert store.delete_partner(partner["id"]) is False
+    assert store.get_partner(partner["id"]) is None
+
+
+@pytest.mark.parametrize(
+    "routing, partner_id",
+    [("hash", 0), ("hash", 1), ("hash", 2), ("range", 0), ("range", 1000), ("range", 10 ** 12)],
+)
+def test_ids_outside_every_shard_are_not_found(tmp_path, routing: str, partner_id: int) -> None:
+    store = make_store(tmp_path, routing)
+    try:
+        assert store.locate(partner_id) is None
+        assert store.get_partner(partner_id) is None
+        assert store.update_partner(partner_id, {}) is None
+        assert store.delete_partner(partner_id) is False
+    finally:
+        store.close()
+
+
+def test_full_range_shards_are_skipped_then_rejected(tmp_path) -> None:
+    store = make_store(tmp_path, "range", shards=2, range_size=3)
+    try:
+        created = [store.create_partner({"n": n}) for n in range(4)]
+        ids = [p["id"] for p in created]
+        assert sorted(ids) == [1, 2, 4, 5]
+        for partner in created:
+            assert store.get_partner(partner["id"]) == partner
+
+        with pytest.raises(RuntimeError):
+            store.create_partner({"n": 4})
+        assert store.count_partners() == 4
+    finally:
+        store.close()
+
+
+def test_range_shard_overflow_moves_to_another_shard(tmp_path) -> None:
+    store = make_store(tmp_path, "range", shards=2, range_size=3)
+    try:
+        with store._sessions[1]() as session:
+            session.add_all([PartnerTable(data="{}"), PartnerTable(data="{}")])
+            session.commit()
+        # Shard 1 already holds local ids 1 and 2, so its next id overflows.
+        created = [store.create_partner({"n": n}) for n in range(2)]
+        assert [p["id"] for p in created] == [1, 2]
+        assert store.count_partners() == 4
+    finally:
+        store.close()
+
+
+def test_find_partners_single_database(db_session: Session) -> None:
+    create_partner(db_session, {"address": {"city": "Oslo"}})
+    create_partner(db_session, {"address": {"city": "Rome"}})
+
+    found = find_partners(db_session, "address.city", "Rome")
+    assert [p["data"]["address"]["city"] for p in found] == ["Rome"]
+    assert count_partners(db_session) == 2
+
+    with pytest.raises(ValueError):
+        find_partners(db_session, "city') OR 1=1 --", "x")
+
+
+def test_partner_api_uses_shards_when_configured(
+    client: TestClient, db_session: Session, tmp_path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "partner_shards", 2)
+    monkeypatch.setattr(
+        settings, "partner_shard_url", f"sqlite:///{tmp_path}/shard-{{shard}}.db"
+    )
+    store = partner_shards.get_partner_store()
+    store.ensure_schema()
+    try:
+        first = client.post("/api/v1/partners/", json={"data": {"a": 1}}).json()
+        second = client.post("/api/v1/partners/", json={"data": {"a": 2}}).json()
+        assert {store.locate(first["id"])[0], store.locate(second["id"])[0]} == {0, 1}
+
+        assert client.get("/api/v1/partners/").json() == [first, second]
+        assert client.get(f"/api/v1/partners/{second['id']}").json() == second
+
+        # Nothing was written to the single-file database.
+        assert list_partners(db_session) == [first, second]
+        monkeypatch.setattr(settings, "partner_shards", 0)
+        assert list_partners(db_session) == []
+    finally:
+        partner_shards.close_partner_store()
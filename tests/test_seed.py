@@ -0,0 +1,49 @@
+import json
+import random
+import sqlite3
+
+import pytest
+
+from app.seed import generate_partners, make_partner_doc, seed_database, sqlite_path
+
+
+@pytest.mark.parametrize("shape", ["flat", "nested"])
+@pytest.mark.parametrize("size", [512, 1024, 8192])
+def test_make_partner_doc_size_and_shape(shape: str, size: int) -> None:
+    doc = make_partner_doc(random.Random(3), size, shape)
+    assert abs(len(json.dumps(doc)) - size) <= 2
+    assert ("contact" in doc) == (shape == "nested")
+
+
+def test_make_partner_doc_rejects_unknown_shape() -> None:
+    with pytest.raises(ValueError):
+        make_partner_doc(random.Random(0), 256, "weird")
+
+
+def test_generators_are_deterministic() -> None:
+    first = list(generate_partners(seed=5, count=10, size=300))
+    assert first == list(generate_partners(seed=5, count=10, size=300))
+    assert first != list(generate_partners(seed=6, count=10, size=300))
+
+
+def test_sqlite_path_requires_a_file() -> None:
+    assert sqlite_path("sqlite:///./data.db") == "./data.db"
+    with pytest.raises(ValueError):
+        sqlite_path("sqlite:///:memory:")
+
+
+def test_seed_database_bulk_loads_rows(tmp_path) -> None:
+    url = f"sqlite:///{tmp_path / 'seed.db'}"
+    result = seed_database(url, users=1234, partners=321, payload_bytes=400, seed=9, batch_size=100)
+    assert result["users"] == 1234 and result["partners"] == 321
+
+    conn = sqlite3.connect(tmp_path / "seed.db")
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM users").fetchone() == (1234,)
+        statuses = {row[0] for row in conn.execute("SELECT DISTINCT status FROM users")}
+        assert statuses == {"active", "inactive"}
+        rows = [row[0] for row in conn.execute("SELECT data FROM partners ORDER BY id")]
+    finally:
+        conn.close()
+
+    assert rows == [text for (text,) in generate_partners(9, 321, 400)]
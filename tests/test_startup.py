@@ -0,0 +1,104 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app import db, main
+from app.config import settings
+from app.crud import user_write_buffer
+from app.main import app
+
+
+def test_ensure_schema_runs_once_per_database(tmp_path) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+
+    assert db.ensure_schema(engine) is True
+    assert {"users", "partners"} <= set(inspect(engine).get_table_names())
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA user_version").scalar() == db.SCHEMA_VERSION
+
+    # A second worker only reads the version header.
+    assert db.ensure_schema(engine) is False
+
+
+@pytest.mark.parametrize("attempt", range(5))
+def test_concurrent_ensure_schema_creates_once(tmp_path, attempt: int) -> None:
+    url = f"sqlite:///{tmp_path / 'race.db'}"
+    workers = 8
+    barrier = threading.Barrier(workers)
+
+    def start_worker() -> bool:
+        engine = create_engine(url)
+        try:
+            barrier.wait()
+            return db.ensure_schema(engine)
+        finally:
+            engine.dispose()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda _: start_worker(), range(workers)))
+    assert results.count(True) == 1
+
+
+def test_ensure_schema_refuses_older_versions(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    assert db.ensure_schema(engine) is True
+
+    monkeypatch.setattr(db, "SCHEMA_VERSION", db.SCHEMA_VERSION + 1)
+    with pytest.raises(RuntimeError, match="migrate"):
+        db.ensure_schema(engine)
+
+
+@pytest.fixture
+def fresh_engine(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(db, "SQLALCHEMY_DATABASE_URL", f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(db, "_engine", None)
+    monkeypatch.setattr(settings, "maintenance_enabled", False)
+    yield
+    if db._engine is not None:
+        db._engine.dispose()
+
+
+def test_lifespan_creates_engine_and_schema(
+    fresh_engine, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(settings, "startup_timing", True)
+    assert db._engine is None  # importing the app did not create it
+
+    with caplog.at_level(logging.INFO, logger="app.main"), TestClient(app):
+        timings = app.state.startup_timings
+        assert timings["schema_created"] is True
+        assert set(timings) == {"imports_ms", "engine_ms", "schema_ms", "schema_created"}
+        assert {"users", "partners"} <= set(inspect(db._engine).get_table_names())
+
+    assert "startup: imports" in caplog.text
+
+
+def test_lifespan_schema_opt_out(fresh_engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "auto_create_schema", False)
+
+    with TestClient(app):
+        assert app.state.startup_timings["schema_created"] is False
+        assert inspect(db._engine).get_table_names() == []
+
+
+def test_lifespan_shutdown_continues_after_failed_flush(
+    fresh_engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def failing_flush(self) -> int:
+        raise RuntimeError("disk full")
+
+    closed = []
+    monkeypatch.setattr(settings, "user_write_behind", True)
+    monkeypatch.setattr(user_write_buffer.StatusWriteBuffer, "flush", failing_flush)
+    monkeypatch.setattr(main, "close_partner_store", lambda: closed.append(True))
+
+    with pytest.raises(Exception):
+        with TestClient(app):
+            assert user_write_buffer.get_status_buffer() is not None
+
+    assert closed == [True]
+    assert user_write_buffer.get_status_buffer() is None
@@ -7,6 +7,7 @@ from app.crud.user_crud import (
     create_user,
     delete_user,
     get_user,
+    list_user_rows,
     update_user,
 )
 
@@ -63,3 +64,17 @@ def test_delete_user(db_session: Session) -> None:
 
     result_second = delete_user(db_session, user.id)
     assert result_second is False
+
+
+def test_list_user_rows_returns_tuples(db_session: Session) -> None:
+    """
+    Test that list_user_rows returns (id, status) pairs for every user.
+    """
+    first = create_user(db_session, status="active")
+    second = create_user(db_session, status="inactive")
+
+    rows = list_user_rows(db_session)
+    assert [tuple(row) for row in rows] == [
+        (first.id, "active"),
+        (second.id, "inactive"),
+    ]
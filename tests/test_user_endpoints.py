@@ -69,4 +69,13 @@ def test_delete_user_success(client: TestClient) -> None:
 
     # Confirm 404 afterwards
     r2 = client.get(f"{BASE}/{user_id}")
-    assert r2.status_code == 404
\ No newline at end of file
+    assert r2.status_code == 404
+
+def test_list_users_returns_created_users(client: TestClient) -> None:
+    first = client.post(f"{BASE}/", json={"status": "active"}).json()
+    second = client.post(f"{BASE}/", json={"status": "inactive"}).json()
+
+    r = client.get(f"{BASE}/")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/json"
+    assert r.json() == [first, second]
@@ -0,0 +1,96 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.crud import user_crud
+from app.crud.user_write_buffer import StatusWriteBuffer, set_status_buffer
+from app.models import UserTable
+
+
+def _committed_status(db_session: Session, user_id: int) -> str:
+    return db_session.execute(
+        select(UserTable.status).where(UserTable.id == user_id)
+    ).scalar_one()
+
+
+@pytest.fixture
+def buffer(db_session: Session):
+    buffer = StatusWriteBuffer(lambda: db_session, window=60, max_pending=100)
+    set_status_buffer(buffer)
+    yield buffer
+    set_status_buffer(None)
+
+
+def test_updates_collapse_and_are_visible_before_flush(
+    db_session: Session, buffer: StatusWriteBuffer
+) -> None:
+    user = user_crud.create_user(db_session, status="active")
+    db_session.expunge_all()
+
+    for status in ("inactive", "active", "inactive"):
+        updated = user_crud.update_user(db_session, user.id, status)
+        assert updated.status == status
+
+    assert _committed_status(db_session, user.id) == "active"
+    assert user_crud.get_user(db_session, user.id).status == "inactive"
+    assert (user.id, "inactive") in user_crud.list_user_rows(db_session)
+    assert buffer.pending_snapshot() == {user.id: "inactive"}
+
+    assert buffer.flush() == 1
+    assert buffer.pending_snapshot() == {}
+    assert _committed_status(db_session, user.id) == "inactive"
+
+
+def test_update_of_missing_user_is_not_buffered(
+    db_session: Session, buffer: StatusWriteBuffer
+) -> None:
+    assert user_crud.update_user(db_session, 9999, "active") is None
+    assert buffer.pending_snapshot() == {}
+
+
+def test_delete_discards_pending_status(
+    db_session: Session, buffer: StatusWriteBuffer
+) -> None:
+    user = user_crud.create_user(db_session, status="active")
+    user_crud.update_user(db_session, user.id, "inactive")
+
+    assert user_crud.delete_user(db_session, user.id) is True
+    assert buffer.pending_snapshot() == {}
+    assert user_crud.get_user(db_session, user.id) is None
+
+
+def test_buffer_flushes_when_full(db_session: Session) -> None:
+    buffer = StatusWriteBuffer(lambda: db_session, window=60, max_pending=2)
+    ids = [user_crud.create_user(db_session, status="active").id for _ in range(2)]
+
+    buffer.put(ids[0], "inactive")
+    assert buffer.pending_snapshot()
+    buffer.put(ids[1], "inactive")
+    assert buffer.pending_snapshot() == {}
+    assert {_committed_status(db_session, user_id) for user_id in ids} == {"inactive"}
+
+
+def test_put_endpoint_reads_back_pending_value(
+    client: TestClient, buffer: StatusWriteBuffer
+) -> None:
+    created = client.post("/api/v1/users/", json={"status": "active"}).json()
+
+    r = client.put(f"/api/v1/users/{created['id']}", json={"status": "inactive"})
+    assert r.status_code == 200
+    assert r.json() == {"id": created["id"], "status": "inactive"}
+
+    assert client.get(f"/api/v1/users/{created['id']}").json()["status"] == "inactive"
+    assert buffer.pending_snapshot() == {created["id"]: "inactive"}
+
+
+def test_update_of_user_deleted_during_flush_is_not_buffered(
+    db_session: Session, buffer: StatusWriteBuffer
+) -> None:
+    user = user_crud.create_user(db_session, status="active")
+    assert user_crud.delete_user(db_session, user.id) is True
+    # A flush that started before the delete still holds the old value.
+    buffer._flushing = {user.id: "inactive"}
+
+    assert user_crud.update_user(db_session, user.id, "active") is None
+    assert not buffer.is_queued(user.id)